@@ -0,0 +1,28 @@
+''' Bind time against argv length for ``*args`` and ``--files#`` parameters.
+
+The time per token should stay flat as argv grows.
+
+    $ python benchmarks/argv.py
+'''
+import sys, os, time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from yaclipy import Command
+
+
+def star(verbose__v=False, *files): pass
+
+def hashed(*, files:[], verbose__v=False): pass
+
+
+def main():
+    for n in [1000, 10000, 100000]:
+        files = [f'file{i}.txt' for i in range(n)]
+        for name, fn, argv in [('*args', star, ['-v', '-'] + files), ('--files#', hashed, ['-v', '--files#'] + files)]:
+            t = time.perf_counter()
+            Command(fn)(argv)
+            t = time.perf_counter() - t
+            print(f"{name:>10} {n:>7}: {t*1e3:8.1f} ms  {t/n*1e6:6.2f} us/token")
+
+
+if __name__ == '__main__':
+    main()
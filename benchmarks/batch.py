@@ -0,0 +1,30 @@
+''' Command lines/sec of one interpreter per line vs. ``python -m yaclipy.batch`` for the same lines.
+
+Uses the 40 sub-command tree of benchmarks/server.py.
+
+    $ python benchmarks/batch.py
+'''
+import sys, os, time, tempfile, subprocess
+sys.path.insert(0, os.path.dirname(__file__))
+from server import write_tree, SRC
+
+
+def main(n=10, lines=5000):
+    with tempfile.TemporaryDirectory() as root:
+        write_tree(root, os.path.join(root, 'app.sock'))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, SRC]))
+        t = time.perf_counter()
+        for i in range(n):
+            subprocess.run([sys.executable, os.path.join(root, 'cli.py'), f'cmd{i%40:02}', '-x', str(i)], env=env, capture_output=True, check=True)
+        print(f"{'python cli.py':>16}: {n / (time.perf_counter() - t):10.1f} lines/sec")
+        path = os.path.join(root, 'lines.txt')
+        with open(path, 'w') as f:
+            f.write(''.join(f'cmd{i%40:02} -x {i}\n' for i in range(lines)))
+        for jobs in [1, 16]:
+            t = time.perf_counter()
+            subprocess.run([sys.executable, '-m', 'yaclipy.batch', 'app:root', path, '-j', str(jobs)], env=env, stdout=subprocess.DEVNULL, check=True)
+            print(f"{f'batch -j {jobs}':>16}: {lines / (time.perf_counter() - t):10.1f} lines/sec")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+''' Per-token coercion cost of the converters compiled for each kind of annotation.
+
+    $ python benchmarks/coerce.py
+'''
+import sys, os, enum, pathlib, timeit
+from typing import List, Literal, Optional
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from yaclipy.arg_spec import ArgType
+from yaclipy.converters import coerce_int
+
+
+def old_coerce_int(v):
+    # coerce_int as it was before the converter registry
+    if isinstance(v, str):
+        if v.lower().startswith('0x'): return int(v, 16)
+        if v.lower().startswith('0b'): return int(v, 2)
+        if len(v)>1 and v.startswith('0') and v[1] in '123456789': return int(v, 8)
+    return int(v)
+
+
+class Level(enum.Enum):
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+
+
+CASES = [
+    ('old coerce_int', old_coerce_int, '12345'),
+    ('coerce_int', coerce_int, '12345'),
+    ('int', ArgType(int).coerce, '12345'),
+    ('List[int]', ArgType(List[int]).coerce, '12345'),
+    ('Optional[float]', ArgType(Optional[float]).coerce, '1.5'),
+    ("Literal['a','b','c']", ArgType(Literal['a','b','c']).coerce, 'b'),
+    ('Enum', ArgType(Level).coerce, 'INFO'),
+    ('Path', ArgType(pathlib.Path).coerce, 'a/b/c.txt'),
+    ('ArgType.add(List[int])', lambda v, t=ArgType(List[int]), acc=[]: t.add(acc, v), '12345'),
+]
+
+
+def main(n=200000):
+    for name, coerce, token in CASES:
+        t = min(timeit.repeat(lambda: coerce(token), number=n, repeat=3))
+        print(f"{name:>24}: {t/n*1e9:8.0f} ns/token")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+''' Shell completion latency on a tree of 500 commands (20 groups of 24 commands, 10 parameters each).
+
+"in-process" loads the manifest and completes, which is the work done by each TAB press.
+"subprocess" is the whole ``python -m yaclipy.complete query`` round trip, including interpreter start-up.
+
+    $ python benchmarks/complete.py
+'''
+import sys, os, time, tempfile, subprocess
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from yaclipy import sub_cmds
+from yaclipy.manifest import Manifest
+from yaclipy.complete import Completer
+
+BUDGET = 0.020 # p95, seconds
+
+QUERIES = [[], ['gro'], ['group07', 'cm'], ['group07', 'cmd03', '--par'], ['group19', '-v', 'cmd22', '--mode', ''], ['group00', 'cmd00', '--ids#', '1', '2', '-']]
+
+
+def make_fn(name):
+    ns = {}
+    exec(f"def {name}(path, /, *, verbose__v=False, count__c=1, ids:[int]=[], mode:'Literal[\"a\",\"b\"]'=None, size=1.5,"
+         f" name__n='', dry_run=False, tags:[str]=[], level=0):\n    ''' The {name} command '''", ns)
+    fn = ns[name]
+    fn.__annotations__['mode'] = __import__('typing').Literal['fast', 'safe']
+    return fn
+
+
+def tree():
+    groups = []
+    for g in range(20):
+        group = make_fn(f'group{g:02}')
+        sub_cmds(*[make_fn(f'cmd{c:02}') for c in range(24)])(group)
+        groups.append(group)
+    root = make_fn('root')
+    return sub_cmds(*groups)(root)
+
+
+def percentiles(times):
+    times = sorted(times)
+    return times[len(times)//2], times[int(len(times)*0.95)]
+
+
+def main(n=100):
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'cli.manifest')
+        t = time.perf_counter()
+        Manifest.build(tree()).save(path)
+        print(f"{'build manifest':>12}: {(time.perf_counter()-t)*1000:7.1f} ms  ({os.path.getsize(path)//1024} KiB)")
+        times = []
+        for i in range(n):
+            t = time.perf_counter()
+            Completer.load(path)(QUERIES[i % len(QUERIES)])
+            times.append(time.perf_counter() - t)
+        p50, p95 = percentiles(times)
+        print(f"{'in-process':>12}: p50 {p50*1000:6.2f} ms  p95 {p95*1000:6.2f} ms")
+        assert p95 < BUDGET, f"p95 {p95*1000:.1f} ms is over the {BUDGET*1000:.0f} ms budget"
+        env = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(__file__), '..', 'src'))
+        times = []
+        for i in range(n//5):
+            t = time.perf_counter()
+            subprocess.run([sys.executable, '-m', 'yaclipy.complete', 'query', path, '--'] + QUERIES[i % len(QUERIES)], env=env, capture_output=True, check=True)
+            times.append(time.perf_counter() - t)
+        p50, p95 = percentiles(times)
+        print(f"{'subprocess':>12}: p50 {p50*1000:6.2f} ms  p95 {p95*1000:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
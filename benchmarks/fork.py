@@ -0,0 +1,49 @@
+''' Throughput (invocations/sec) of plain ``python cli.py`` vs. the warm server and the fork-server.
+
+The plain runs are sequential processes.  The servers are driven by 8 client threads calling `forward`.
+
+    $ python benchmarks/fork.py
+'''
+import sys, os, time, tempfile, subprocess
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.dirname(__file__))
+from server import write_tree, SRC
+sys.path.insert(0, SRC)
+from yaclipy.server import forward
+
+ARGV = ['cmd07', '-x', '1']
+
+
+def plain(root, env, n=10):
+    t = time.perf_counter()
+    for _ in range(n):
+        subprocess.run([sys.executable, os.path.join(root, 'cli.py')] + ARGV, env=env, capture_output=True, check=True)
+    return n / (time.perf_counter() - t)
+
+
+def served(root, env, sock, fork, n=400):
+    if os.path.exists(sock): os.unlink(sock)
+    server = subprocess.Popen([sys.executable, '-m', 'yaclipy.server', 'app:root', sock] + (['--fork'] if fork else []), env=env)
+    try:
+        while not os.path.exists(sock): time.sleep(0.01)
+        with open(os.devnull, 'w') as null, ThreadPoolExecutor(8) as pool:
+            t = time.perf_counter()
+            assert(set(pool.map(lambda _: forward(sock, ARGV, stdio=(0, null, null)), range(n))) == {0})
+            return n / (time.perf_counter() - t)
+    finally:
+        server.kill()
+        server.wait()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        sock = os.path.join(root, 'app.sock')
+        write_tree(root, sock)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, SRC]))
+        print(f"{'python cli.py':>14}: {plain(root, env):8.1f} invocations/sec")
+        print(f"{'server':>14}: {served(root, env, sock, False):8.1f} invocations/sec")
+        print(f"{'fork-server':>14}: {served(root, env, sock, True):8.1f} invocations/sec")
+
+
+if __name__ == '__main__':
+    main()
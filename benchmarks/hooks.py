@@ -0,0 +1,42 @@
+''' Invocations/sec of a three link synchronous chain with no hooks, an empty hook and a `Profile`.
+
+    $ python benchmarks/hooks.py
+'''
+import sys, os, timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from yaclipy import Command, sub_cmds, hooks
+from yaclipy.profile import Profile
+
+
+def save(*, _input, dry_run=False):
+    pass
+
+
+@sub_cmds(save)
+def transform(*, _input, scale:int=1):
+    return _input * scale
+
+
+@sub_cmds(transform)
+def load(n:int):
+    return n
+
+
+ARGV = ['3', 'transform', '--scale', '2', 'save']
+
+
+class Empty():
+    pass
+
+
+def main(n=2000):
+    cmd = Command(load)
+    for name, hook in [('no hooks', None), ('empty hook', Empty()), ('profile', Profile())]:
+        if hook: hooks.add(hook)
+        t = min(timeit.repeat(lambda: cmd(ARGV).run(), number=n, repeat=3))
+        if hook: hooks.remove(hook)
+        print(f"{name:>12}: {n/t:10.0f} invocations/sec")
+
+
+if __name__ == '__main__':
+    main()
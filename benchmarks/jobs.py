@@ -0,0 +1,35 @@
+''' Fan-out of a generator to an I/O-bound async sub-command with ``run(jobs=N)``.
+
+The sub-command sleeps for 20ms, so the ideal time is ``items / jobs * 20ms``.
+
+    $ python benchmarks/jobs.py
+'''
+import sys, os, time, asyncio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from yaclipy import Command, sub_cmds
+
+LATENCY = 0.02
+
+
+async def fetch(*, _input):
+    await asyncio.sleep(LATENCY)
+
+
+@sub_cmds(fetch)
+def hosts(n:int):
+    yield from range(n)
+
+
+def main(n=256):
+    bound = Command(hosts)([str(n), 'fetch'])
+    base = None
+    for jobs in [1, 4, 16, 64, 256]:
+        t = time.perf_counter()
+        bound.run(jobs=jobs)
+        t = time.perf_counter() - t
+        base = base or t
+        print(f"jobs={jobs:<4}: {t*1000:8.1f}ms  speedup {base/t:6.1f}x  (ideal {jobs}x)")
+
+
+if __name__ == '__main__':
+    main()
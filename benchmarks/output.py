@@ -0,0 +1,32 @@
+''' Records/sec written by each output sink (to /dev/null) for a generator that yields small dicts.
+
+    $ python benchmarks/output.py
+'''
+import sys, os, time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from yaclipy import Command, sub_cmds
+from yaclipy.output import sink
+
+
+def record(*, _input):
+    return _input
+
+
+@sub_cmds(record)
+def records(n:int):
+    for i in range(n):
+        yield {'id': i, 'name': f'host{i}', 'ok': i % 3 == 0}
+
+
+def main(n=50000):
+    with open(os.devnull, 'w') as null:
+        for output in ['pretty', 'jsonl', 'csv', 'tsv', 'raw']:
+            m = n // 50 if output == 'pretty' else n
+            bound = Command(records)([str(m), 'record'])
+            t = time.perf_counter()
+            bound.run(stream=True, output=sink(output, null))
+            print(f"{output:>8}: {m / (time.perf_counter() - t):10.0f} records/sec")
+
+
+if __name__ == '__main__':
+    main()
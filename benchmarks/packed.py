@@ -0,0 +1,32 @@
+''' Binding a large list of floats into ``[float]`` vs. a packed ``array('d')``.
+
+    $ python benchmarks/packed.py [n]
+'''
+import sys, os, time
+from array import array
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from yaclipy.arg_spec import ArgSpec
+
+
+def as_list(*, samples:[float]): pass
+
+def as_array(*, samples:array('d')): pass
+
+
+def size_of(val):
+    if isinstance(val, list): return sys.getsizeof(val) + sum(sys.getsizeof(v) for v in val)
+    return sys.getsizeof(val)
+
+
+def main(n=1000000):
+    argv = ['--samples#'] + [str(i * 0.5) for i in range(n)]
+    for fn in [as_list, as_array]:
+        spec = ArgSpec(fn)
+        t = time.perf_counter()
+        samples = spec(argv).kwargs['samples']
+        t = time.perf_counter() - t
+        print(f"{fn.__name__:>10}: {t:6.2f} s  {t/n*1e6:6.2f} us/value  {size_of(samples)/n:6.1f} bytes/value")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
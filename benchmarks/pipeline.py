@@ -0,0 +1,46 @@
+''' Throughput of a three stage async chain (fetch -> parse -> store), each stage taking 5ms per item.
+
+Without a buffer each item goes through all three stages before the next one is fetched.
+With ``run(buffer=N)`` the fetch and parse generators run ahead in their own tasks.
+
+    $ python benchmarks/pipeline.py
+'''
+import sys, os, time, asyncio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from yaclipy import Command, sub_cmds
+
+LATENCY = 0.005
+
+
+async def store(*, _input):
+    await asyncio.sleep(LATENCY)
+
+
+@sub_cmds(store)
+async def parse(*, _input):
+    for chunk in _input:
+        await asyncio.sleep(LATENCY)
+        yield chunk
+
+
+@sub_cmds(parse)
+async def fetch(n:int):
+    for i in range(n):
+        await asyncio.sleep(LATENCY)
+        yield [i, i] # Two records per page
+
+
+
+def main(n=100):
+    bound = Command(fetch)([str(n), 'parse', 'store'])
+    base = None
+    for buffer in [0, 1, 4, 16]:
+        t = time.perf_counter()
+        bound.run(stream=True, buffer=buffer)
+        t = time.perf_counter() - t
+        base = base or t
+        print(f"buffer={buffer:<3}: {2*n/t:8.1f} records/sec  speedup {base/t:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+''' A CPU-bound sub-command (hashing) run in the event loop vs. ``@processes(n)``.
+
+The speedup is limited by the number of cores.
+
+    $ python benchmarks/processes.py
+'''
+import sys, os, time, hashlib
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from yaclipy import Command, sub_cmds, processes
+
+
+def digest(*, _input):
+    h = _input.to_bytes(8, 'big')
+    for _ in range(20000): h = hashlib.sha256(h).digest()
+    return None
+
+
+@sub_cmds(digest)
+def blocks(n:int):
+    yield from range(n)
+
+
+def main(n=64):
+    print(f"{os.cpu_count()} cores")
+    bound = Command(blocks)([str(n), 'digest'])
+    base = None
+    for workers in [None, 1, 2, 4, 8]:
+        if workers: processes(workers, chunksize=4)(blocks)
+        t = time.perf_counter()
+        bound.run()
+        t = time.perf_counter() - t
+        base = base or t
+        name = f"processes={workers}" if workers else 'event loop'
+        print(f"{name:>12}: {t*1000:8.1f}ms  speedup {base/t:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+''' Cold vs. warm invocation latency of a CLI with 40 sub-commands.
+
+"cold" runs the command in a fresh interpreter, importing the command tree.
+"warm" forwards the same invocation to a server that has the tree imported already.
+Both use the same client script, which falls back to running the command itself when there's no server.
+
+    $ python benchmarks/server.py
+'''
+import sys, os, time, tempfile, subprocess
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+HEAVY = ['decimal', 'email.mime.text', 'http.client', 'xml.dom.minidom', 'sqlite3', 'csv', 'difflib', 'tarfile']
+N = 40
+
+CLIENT = '''import sys
+from yaclipy.server import forward
+status = forward({sock!r})
+if status == None:
+    import app, yaclipy as CLI
+    CLI.Command(app.root)(sys.argv[1:]).run()
+    status = 0
+sys.exit(status)
+'''
+
+
+def write_tree(root, sock):
+    for i in range(N):
+        with open(os.path.join(root, f'sub{i:02}.py'), 'w') as f:
+            f.write(f'import {HEAVY[i % len(HEAVY)]}\n\ndef cmd{i:02}(x=0):\n    return x\n')
+    with open(os.path.join(root, 'app.py'), 'w') as f:
+        f.write(''.join(f'from sub{i:02} import cmd{i:02}\n' for i in range(N)))
+        f.write(f'import yaclipy as CLI\n@CLI.sub_cmds({", ".join(f"cmd{i:02}" for i in range(N))})\ndef root(): pass\n')
+    with open(os.path.join(root, 'cli.py'), 'w') as f:
+        f.write(CLIENT.format(sock=sock))
+
+
+def measure(root, env, repeat=10):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(root, 'cli.py'), 'cmd07', '-x', '1'], env=env, capture_output=True, check=True)
+        times.append(time.perf_counter() - t)
+    return sorted(times)[len(times)//2]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        sock = os.path.join(root, 'app.sock')
+        write_tree(root, sock)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, SRC]))
+        print(f"{'cold':>8}: {measure(root, env)*1000:8.1f} ms")
+        server = subprocess.Popen([sys.executable, '-m', 'yaclipy.server', 'app:root', sock], env=env)
+        try:
+            while not os.path.exists(sock): time.sleep(0.01)
+            print(f"{'warm':>8}: {measure(root, env)*1000:8.1f} ms")
+        finally:
+            server.kill()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
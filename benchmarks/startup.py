@@ -0,0 +1,50 @@
+''' Start-up cost of a leaf invocation in a CLI with many sub-commands.
+
+Each sub-command lives in its own module that imports a few heavy-ish standard library modules.
+"eager" imports every sub-command module up front, "lazy" names them with ``"module:function"`` strings.
+
+    $ python benchmarks/startup.py
+'''
+import sys, os, time, tempfile, subprocess
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+HEAVY = ['decimal', 'email.mime.text', 'http.client', 'xml.dom.minidom', 'sqlite3', 'csv', 'difflib', 'tarfile']
+N = 40
+
+
+def write_tree(root):
+    for i in range(N):
+        with open(os.path.join(root, f'sub{i:02}.py'), 'w') as f:
+            f.write(f'import {HEAVY[i % len(HEAVY)]}\n\ndef cmd{i:02}(x=0):\n    return x\n')
+    refs = ', '.join(f"'sub{i:02}:cmd{i:02}'" for i in range(N))
+    with open(os.path.join(root, 'lazy.py'), 'w') as f:
+        f.write(f'import sys, yaclipy as CLI\n@CLI.sub_cmds({refs})\ndef root(): pass\n')
+    with open(os.path.join(root, 'eager.py'), 'w') as f:
+        f.write(''.join(f'from sub{i:02} import cmd{i:02}\n' for i in range(N)))
+        f.write(f'import sys, yaclipy as CLI\n@CLI.sub_cmds({", ".join(f"cmd{i:02}" for i in range(N))})\ndef root(): pass\n')
+    for name in ('lazy', 'eager'):
+        with open(os.path.join(root, name+'.py'), 'a') as f:
+            f.write('CLI.Command(root)(sys.argv[1:])\nprint(len(sys.modules))\n')
+
+
+def measure(root, name, repeat=5):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, SRC]))
+    best = None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = subprocess.run([sys.executable, os.path.join(root, name+'.py'), 'cmd07', '-x', '1'], env=env, capture_output=True, text=True, check=True).stdout
+        t = time.perf_counter() - t
+        best = t if best == None else min(best, t)
+    return best, int(out.split()[-1])
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        write_tree(root)
+        for name in ('eager', 'lazy'):
+            t, mods = measure(root, name)
+            print(f"{name:>8}: {t*1000:8.1f} ms  {mods:5} modules")
+
+
+if __name__ == '__main__':
+    main()
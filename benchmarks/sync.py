@@ -0,0 +1,40 @@
+''' Invocations/sec of a three link synchronous chain: bind + run, with and without an event loop.
+
+    $ python benchmarks/sync.py
+'''
+import sys, os, timeit, asyncio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from yaclipy import Command, sub_cmds
+from yaclipy.command import Run
+
+
+def save(*, _input, dry_run=False):
+    pass
+
+
+@sub_cmds(save)
+def transform(*, _input, scale:int=1):
+    return _input * scale
+
+
+@sub_cmds(transform)
+def load(n:int):
+    return n
+
+
+ARGV = ['3', 'transform', '--scale', '2', 'save']
+
+
+def main(n=2000):
+    cmd = Command(load)
+    assert(cmd(ARGV).sync)
+    for name, stmt in [
+        ('asyncio.run', lambda: asyncio.run(cmd(ARGV)._start(None, Run()))),
+        ('sync fast path', lambda: cmd(ARGV).run()),
+    ]:
+        t = min(timeit.repeat(stmt, number=n, repeat=3))
+        print(f"{name:>16}: {n/t:10.0f} invocations/sec")
+
+
+if __name__ == '__main__':
+    main()
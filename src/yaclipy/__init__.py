@@ -1,5 +1,19 @@
 # SPDX-FileCopyrightText: 2023-present Aaron <aaron@framelunch.jp>
 #
 # SPDX-License-Identifier: MIT
-from .command import Command, sub_cmds
-from .config import get_config, copy_config, include, config_var, configure, set_config
+
+_command_names = {'Command', 'sub_cmds', 'jobs', 'processes', 'blocking', 'pipeline'}
+_config_names = {'get_config', 'copy_config', 'include', 'config_var', 'configure', 'set_config'}
+__all__ = sorted(_command_names | _config_names)
+
+
+def __getattr__(name):
+    # The modules are only imported when they are used, so that light-weight sub-modules
+    # (such as yaclipy.complete) don't pay for importing the rest.
+    if name in _command_names:
+        from . import command
+        return getattr(command, name)
+    if name in _config_names:
+        from . import config
+        return getattr(config, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
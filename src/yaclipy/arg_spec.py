@@ -1,16 +1,11 @@
-import inspect, os, copy, json, re
+import inspect, itertools, weakref, threading, collections
+from types import MethodType, MethodDescriptorType, WrapperDescriptorType, ClassMethodDescriptorType
+from array import array
 from inspect import Parameter
-from print_ext import Table, pretty, Line
-from print_ext.widget import INFINITY
-from .exceptions import UsageError
-
-def coerce_int(v):
-    if isinstance(v, str):
-        if v.lower().startswith('0x'): return int(v, 16)
-        if v.lower().startswith('0b'): return int(v, 2)
-        if len(v)>1 and v.startswith('0') and v[1] in '123456789': return int(v, 8)
-    return int(v)
+from .argv import ArgvCursor, VALUE, TERM, KEYWORD, INFINITY
+from .converters import converter
 
+# print_ext and the exceptions are only imported for errors and help, see `ArgBind.error`.
 
 def sig_kinds(fn):
     kinds = set()
@@ -43,53 +38,172 @@ def dashed(name):
     return ('--' if len(name) > 1 else '-') + name
 
 
+def is_ndarray(val):
+    return type(val).__name__ == 'ndarray' and hasattr(val, 'dtype')
+
+
+
+class Packed():
+    ''' The accumulator for a packed list parameter (an ``array.array`` or numpy array type).
+
+    The raw tokens are collected and coerced in batches of `CHUNK`, so that memory stays near the packed size
+    and type errors still show up early.  The packed chunks are only joined once, for `items`.
+    '''
+    CHUNK = 4096
+
+    def __init__(self, atype, pval):
+        self.atype = atype
+        self.raw = []
+        self.chunks = [atype.pack([]) if pval is Parameter.empty else atype.pack(pval)]
+
+
+    @property
+    def items(self):
+        if len(self.chunks) > 1: self.chunks = [self.atype.concat(self.chunks)]
+        return self.chunks[0]
+
+
+    def extend(self, vals):
+        self.raw.extend(vals)
+        if len(self.raw) >= self.CHUNK: self.flush()
+
+
+    def flush(self):
+        raw, self.raw = self.raw, []
+        self.chunks.append(self.atype.coerce_many(raw))
+
+
+
 class ArgType():
     def __init__(self, val):
-        self.repeated = False
-        if isinstance(val, list):
-            self.repeated = True
-            val = val[0] if val else ''
-        if not callable(val):
-            val = type(val)
-        self.coerce = str if val==type(None) or val==Parameter.empty else val
-        if self.coerce == int: self.coerce = coerce_int
+        self.packed = None
+        if isinstance(val, array) or is_ndarray(val):
+            if (val.typecode not in 'bBhHiIlLqQfd') if isinstance(val, array) else (val.dtype.kind not in 'iuf'):
+                raise ValueError(f"We can't handle packed arrays of {val!r}")
+            self.packed = val
+            val = [float if (val.typecode in 'fd' if isinstance(val, array) else val.dtype.kind == 'f') else int]
+        self.coerce, self.name, self.repeated = converter(val)
         self.is_flag = self.coerce == bool
-        if self.coerce == dict: self.coerce = json.loads
+        self.is_json = getattr(self.coerce, '__module__', None) == 'json'
         if self.repeated and self.is_flag: raise ValueError("We can't handle repeated bool arguments")
 
 
     def __repr__(self):
-        return f'[{self.coerce.__name__}]' if self.repeated else self.coerce.__name__
+        if isinstance(self.packed, array): return f"array('{self.packed.typecode}')"
+        if self.packed is not None: return f"ndarray({self.packed.dtype})"
+        return f'[{self.name}]' if self.repeated else self.name
 
 
-    def merge(self, val, pval):
-        if val == None: # append nothing to the list (but make sure it exists)
-            return [] if pval == Parameter.empty else pval
+    def pack(self, vals):
+        ''' A new packed array of the (already coerced) `vals`.
+        '''
+        if isinstance(self.packed, array): return array(self.packed.typecode, vals)
+        import numpy
+        return numpy.array(vals, dtype=self.packed.dtype)
+
+
+    def coerce_many(self, vals):
+        ''' Coerce a batch of raw values with the parameter's converter into a new packed array.
+
+        A value that doesn't fit the typecode (or dtype) is a type mismatch.
+        '''
+        items = [self._coerce_one(v) for v in vals]
+        try:
+            return self.pack(items)
+        except (OverflowError, TypeError, ValueError):
+            for v, item in zip(vals, items):
+                try:
+                    self.pack([item])
+                except (OverflowError, TypeError, ValueError):
+                    raise self._mismatch(v)
+            raise
+
+
+    def concat(self, chunks):
+        ''' Join the packed `chunks` into one array.
+        '''
+        if isinstance(self.packed, array):
+            items = chunks[0]
+            for c in chunks[1:]: items += c
+            return items
+        import numpy
+        return numpy.concatenate(chunks)
+
+
+    def _coerce_one(self, val):
+        try:
+            assert(isinstance(val, str)) # Don't coerce True
+            return self.coerce(val)
+        except Exception as e:
+            raise self._mismatch(val)
+
+
+    def _mismatch(self, val):
+        from print_ext import Line
+        return ValueError(Line(f"Couldn't coerce '\b2 {val}\b ' to '\b2 {self}\b '."))
+
+
+    def begin(self, pval=Parameter.empty):
+        ''' Start accumulating values on top of the previous value `pval`.
+
+        Lists are copied once here so that `add` can append to them in place.
+        '''
+        if self.packed is not None:
+            return Packed(self, pval)
+        if self.repeated:
+            return [] if pval is Parameter.empty else list(pval)
+        return list(pval) if isinstance(pval, list) else pval
+
+
+    def add(self, acc, val):
+        ''' Coerce `val` and add it to the accumulator `acc`.  The new accumulator is returned.
+        '''
+        if val is None: # append nothing to the list (but make sure it exists)
+            return [] if acc is Parameter.empty else acc
+        if self.packed is not None:
+            if not isinstance(val, str): self._coerce_one(val)
+            acc.extend((val,))
+            return acc
         try:
             assert(not (self.is_flag and not isinstance(val, bool))) # Only True can be set on bools
             assert(not (self.coerce==str and not isinstance(val, str))) # Don't coerce None or True to a string
             val = self.coerce(val)
         except Exception as e:
-            raise ValueError(Line(f"Couldn't coerce '\b2 {val}\b ' to '\b2 {self}\b '."))
+            raise self._mismatch(val)
         if self.repeated:
-            return ([] if pval == Parameter.empty else pval) + [val]
+            acc.append(val)
+            return acc
         elif self.is_flag:
-            return val if pval == Parameter.empty else int(pval)+1
-        elif self.coerce == json.loads:
-            if isinstance(pval, dict) and isinstance(val, dict):
-                pval.update(val)
-                return pval
-            elif isinstance(pval, list) and isinstance(val, list):
-                return pval + val
+            return val if acc is Parameter.empty else int(acc)+1
+        elif self.is_json:
+            if isinstance(acc, dict) and isinstance(val, dict):
+                acc.update(val)
+                return acc
+            elif isinstance(acc, list) and isinstance(val, list):
+                acc.extend(val)
+                return acc
             return val
         else:
             return val
-            
+
+
+    def finish(self, acc):
+        ''' Turn the accumulator into the final value.
+        '''
+        if isinstance(acc, Packed):
+            acc.flush()
+            return acc.items
+        return acc
+
+
+    def merge(self, val, pval):
+        return self.finish(self.add(self.begin(pval), val))
+
 
 
 class ArgParam(dict):
     def __repr__(self):
-        return f"{self.name}:{','.join(self.aliases)}@{self.index}<{self.type}>{self.value}"
+        return f"{self.name}:{','.join(self.aliases)}@{self.index}<{self.type}>"
 
 
     def __getattr__(self, key):
@@ -99,16 +213,6 @@ class ArgParam(dict):
             raise AttributeError(key)
 
     
-    def set(self, val, index):
-        try:
-            self['value'] = self.type.merge(val, self.value)
-        except ValueError as e:
-            if isinstance(index, int):
-                self.spec.error('TYPE_MISMATCH', f"Type mismatch on \b1 {self.ordinal}\b  parameter.  {e}")
-            else:
-                self.spec.error('TYPE_MISMATCH', f"Parameter '\b1 {index}\b ' type mismatch.  {e}")
-
-
     @property
     def ordinal(self):
         n = self.index
@@ -124,8 +228,7 @@ class ArgParam(dict):
     def new(spec, /, **kwargs):
         args = dict(index=0, aliases=[], type=None, default=Parameter.empty, kind=Parameter.KEYWORD_ONLY)
         args.update(kwargs)
-        args['spec'] = spec
-        args['value'] = Parameter.empty
+        args['slot'] = len(spec.params)
         param = ArgParam(**args)
         spec.params[param.name] = param
         if param.aliases:
@@ -139,46 +242,39 @@ class ArgParam(dict):
 
 
 class ArgSpec():
-    kw_re = re.compile(r'--?[a-zA-Z][-\w]*(#([1-9][0-9]*)?)?$')
+    ''' The compiled parameter specification of a function.
 
+    It is built once per function and is never modified afterwards.
+    Calling it with an argv returns a new `ArgBind` that holds the parsed values.
+    '''
     def __init__(self, fn, is_method=False):
-        self.errors = []
-        self.unknown = []
         self.alias = {}
         self.params = {}
-        self.fn = fn
-        self.kinds = set()
-        self.args = None
-        self.kwargs = None
+        self._fn = lambda: fn
+        self.kinds = frozenset()
         self.has_self = False
-        # Are we cloning?
-        if isinstance(fn, ArgSpec):
-            for param in fn.params.values():
-                ArgParam.new(self, **param)
-            self.has_self, self.kinds, self.fn, self.sig = fn.has_self, fn.kinds, fn.fn, fn.sig
-            return
-        # We are not a clone
         try:
-            self.sig = inspect.signature(self.fn)
+            self.sig = inspect.signature(fn)
         except:
             self.sig = None
             return
         # Figure out a set of kinds
-        self.kinds.update(sig_kinds(fn))
+        kinds = sig_kinds(fn)
         for i, name in enumerate(self.sig.parameters):
             p = self.sig.parameters[name]
             if p.kind == Parameter.VAR_POSITIONAL:
-                self.kinds.add('*')
+                kinds.add('*')
                 continue
             if p.kind == Parameter.VAR_KEYWORD:
-                self.kinds.add('**')
+                kinds.add('**')
                 continue
 
             if name.startswith('_') and p.kind == Parameter.POSITIONAL_ONLY:
+                from .exceptions import UsageError
                 raise UsageError(fn, f"Private parameter '{name}' must be a keyword parameter.")
             ArgParam.new(self,
                 name = name,
-                type = ArgType(p.default if p.annotation == Parameter.empty else p.annotation),
+                type = ArgType(p.default if p.annotation is Parameter.empty else p.annotation),
                 aliases = list(name_split(name)) if p.kind in [Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY] else [],
                 default = p.default,
                 index = 0 if p.kind==Parameter.KEYWORD_ONLY else i+1,
@@ -187,53 +283,233 @@ class ArgSpec():
         # The help parameter is always available
         ArgParam.new(self, name='', type=ArgType(bool), default=False, aliases=['help', 'h'])
         self.has_self = 'self' in self.params and self.params['self'].index == 1
+        self.kinds = frozenset(kinds)
 
 
     def __bool__(self):
         return self.sig != None
 
 
+    @property
+    def fn(self):
+        return self._fn()
+
+
     @property
     def retval(self):
         return Parameter.empty if self.sig==None else self.sig.return_annotation
 
 
     def __call__(self, argv):
-        spec = ArgSpec(self)
-        spec.arg_bind(argv)
-        return spec
-        
-
-    def error(self, code, *args, **kwargs):
-        self.errors.append((code, Line(*args, **kwargs)))
+        if not isinstance(argv, ArgvCursor): argv = ArgvCursor(argv)
+        bound = ArgBind(self)
+        bound.arg_bind(argv)
+        return bound
 
 
     def set_alias(self, a, param):
         if a == 'self' and (param.index != 1 or param.name != 'self'):
+            from .exceptions import UsageError
             raise UsageError(self.fn, f"Invalid parameter \b1 {param.name}\b .\v\b1 self\b  is reserved.")
         if a in self.alias:
+            from .exceptions import UsageError
             prev = self.alias[a]
             if a in ['h','help']:
                 raise UsageError(self.fn, f"Invalid parameter \b1 {prev.name}\b .  The alias \b1 {a}\b  is reserved for the help flag.")
-            raise UsageError(self.fn, f"Argument \b1 {a}\b  was defined multiple times. \b2 {prev.name} {param.name} ")  
+            raise UsageError(self.fn, f"Argument \b1 {a}\b  was defined multiple times. \b2 {prev.name} {param.name} ")
         self.alias[a] = param
 
 
+    def pretty_params(self, print, *, _depth, depth, **kwargs):
+        from print_ext import Table, pretty
+        tbl = Table(0,0,0,0,0)
+        tbl.cell("C0", just='>')
+        tbl.cell("C1", style='1', just='>')
+        tbl.cell("R0", style='w!')
+        tbl('Aliases\tName\tPos\tType\tDefault\t')
+        for v in self.params.values():
+            if v.name=='': continue # Skip help
+            tbl(' '.join(sorted(v.aliases)) if v.aliases else ' ', '\t')
+            tbl(v.name, '\t')
+            tbl(v.index or ' ', '\t')
+            tbl(v.type, '\t')
+            tbl(pretty('\br *req*' if v.default is Parameter.empty else v.default, _depth=_depth+1, depth=depth-1, **kwargs), '\t')
+        print(tbl)
+
+
+    def __pretty__(self, print, **kwargs):
+        print(f"\b1 {func_name(self.fn,'__qualname__')}[\b2 {' '.join(self.kinds)}\b ]")
+        self.pretty_params(print, **kwargs)
+
+
+
+_specs = weakref.WeakKeyDictionary() # function -> ArgSpec
+_method_specs = weakref.WeakKeyDictionary() # bound method's __func__ -> ArgSpec
+_descriptor_specs = {} # Built-in method descriptors can't be weakly referenced, but they live forever anyway.
+_spec_lock = threading.Lock()
+_spec_stats = [0, 0]
+
+SpecCacheInfo = collections.namedtuple('SpecCacheInfo', 'hits misses currsize')
+
+
+def spec_of(fn):
+    ''' Get the compiled `ArgSpec` of `fn`.
+
+    The signature of each function is only analysed once per process.
+    Specs are cached weakly by the function (or the underlying function of a bound method) so they go away with it.
+    '''
+    if isinstance(fn, MethodType):
+        cache, key = _method_specs, fn.__func__
+    elif isinstance(fn, (MethodDescriptorType, WrapperDescriptorType, ClassMethodDescriptorType)):
+        cache, key = _descriptor_specs, fn
+    else:
+        cache, key = _specs, fn
+    try:
+        spec = cache[key]
+        _spec_stats[0] += 1
+        return spec
+    except KeyError:
+        pass
+    except TypeError: # Can't be cached
+        _spec_stats[1] += 1
+        return ArgSpec(fn)
+    with _spec_lock:
+        spec = cache.get(key)
+        if spec == None:
+            spec = ArgSpec(fn)
+            if cache is not _descriptor_specs: spec._fn = weakref.ref(key)
+            cache[key] = spec
+            _spec_stats[1] += 1
+        else:
+            _spec_stats[0] += 1
+    return spec
+
+
+def spec_cache_info():
+    ''' The number of `spec_of` cache hits, misses (signature analyses) and the current number of cached specs.
+    '''
+    return SpecCacheInfo(*_spec_stats, len(_specs) + len(_method_specs) + len(_descriptor_specs))
+
+
+
+class ArgBind():
+    ''' The state of a single bind of an argv against an `ArgSpec`.
+
+    The parsed values live in a list indexed by each parameter's slot.
+    Unknown parameters (destined for ``**kwargs``) are kept here so that the spec is never modified.
+    Binding `stopped` at the first value of a list that couldn't be coerced, so the rest of the list
+    (which might be a huge response file) is neither read nor kept.
+    '''
+    __slots__ = ('spec', 'values', 'errors', 'unknown', 'args', 'kwargs', 'cursor', 'stopped')
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.values = [Parameter.empty] * len(spec.params)
+        self.errors = []
+        self.unknown = {}
+        self.args = None
+        self.kwargs = None
+        self.cursor = None
+        self.stopped = False
+
+
+    @property
+    def fn(self):
+        return self.spec.fn
+
+
+    @property
+    def kinds(self):
+        return self.spec.kinds
+
+
+    @property
+    def params(self):
+        return self.spec.params
+
+
+    @property
+    def has_self(self):
+        return self.spec.has_self
+
+
+    @property
+    def argv(self):
+        ''' The arguments that have not been consumed (yet).
+        '''
+        return self.cursor.rest() if self.cursor else []
+
+
+    def value(self, param):
+        return self.values[param.slot]
+
+
+    def error(self, code, *args, **kwargs):
+        from print_ext import Line
+        self.errors.append((code, Line(*args, **kwargs)))
+
+
+    def set(self, param, val, index):
+        ''' Add `val` to the parameter.  Returns False if it couldn't be coerced.
+        '''
+        acc = self.values[param.slot]
+        try:
+            if acc is Parameter.empty: acc = param.type.begin()
+            self.values[param.slot] = param.type.add(acc, val)
+            return True
+        except ValueError as e:
+            self.type_mismatch(param, index, e)
+            return False
+
+
+    def extend(self, param, vals, index):
+        ''' Add the raw `vals` to a packed parameter, which has been `set` already.  Returns False if they couldn't be coerced.
+        '''
+        try:
+            self.values[param.slot].extend(vals)
+            return True
+        except ValueError as e:
+            self.type_mismatch(param, index, e)
+            return False
+
+
+    def stop(self):
+        ''' Stop binding, after a list value that couldn't be coerced.
+        '''
+        self.stopped = True
+
+
+    def type_mismatch(self, param, index, e):
+        if isinstance(index, int):
+            self.error('TYPE_MISMATCH', f"Type mismatch on \b1 {param.ordinal}\b  parameter.  {e}")
+        else:
+            self.error('TYPE_MISMATCH', f"Parameter '\b1 {index}\b ' type mismatch.  {e}")
+
+
     def arg_bind(self, argv):
-        self.argv = argv
+        self.cursor = argv
+        spec, values = self.spec, self.values
         # Parse positional args
-        for param in self.params.values():
+        for param in spec.params.values():
             if not param.index: break
             while self._parse_parg(param, argv) and param.type.repeated: pass
+            if self.stopped: break
         # Parse keyword args
-        while self._parse_kwargs(argv): pass
+        while not self.stopped and self._parse_kwargs(argv): pass
+        # Finish accumulating values
+        for param in itertools.chain(spec.params.values(), self.unknown.values()):
+            if values[param.slot] is Parameter.empty: continue
+            try:
+                values[param.slot] = param.type.finish(values[param.slot])
+            except ValueError as e:
+                values[param.slot] = values[param.slot].items
+                self.type_mismatch(param, param.index or dashed(param.aliases[0]), e)
         # Set default values
-        for name, param in self.params.items():
-            if param.value != Parameter.empty: continue
-            #param['value'] = copy.deepcopy(param.default) # bypass the coerce
-            if param.default != Parameter.empty: continue
+        for name, param in spec.params.items():
+            if values[param.slot] is not Parameter.empty: continue
+            if param.default is not Parameter.empty: continue
             # This parameter remains unset!
-            if param.name.startswith('_') or (self.has_self and param.index==1):
+            if param.name.startswith('_') or (spec.has_self and param.index==1):
                 continue # self or hidden parameters will be supplied at runtime
             elif not param.aliases and param.ordinal:
                 self.error('NO_VALUE', f"No value supplied for the \b1 {param.ordinal}\b  positional parameter (\b2 {name}\b )")
@@ -242,39 +518,51 @@ class ArgSpec():
                 pos = f'\b1 {param.ordinal}\b  positional' if param.ordinal else 'keyword-only'
                 self.error('NO_VALUE', f"No value supplied for the {pos} parameter{aka}.")
         # De-list unknowns
-        for param in self.unknown:
-            if not isinstance(param.value, list): continue
-            if len(param.value) > 1: continue
-            param['value'] = param.value[0]
+        for param in self.unknown.values():
+            if not isinstance(values[param.slot], list): continue
+            if len(values[param.slot]) > 1: continue
+            values[param.slot] = values[param.slot][0]
             param.type.repeated = False
         # Unknown parameters
-        if '**' not in self.kinds and self.unknown:
-            for param in sorted(self.unknown, key=lambda x: x.name):
-                self.error('UNK_PARAM', f"Unknown parameter: \b1 {dashed(param.name)}\b2  {param.value!r}")
+        if '**' not in spec.kinds and self.unknown:
+            for param in sorted(self.unknown.values(), key=lambda x: x.name):
+                self.error('UNK_PARAM', f"Unknown parameter: \b1 {dashed(param.name)}\b2  {values[param.slot]!r}")
         # Build args, kwargs
         self.args, self.kwargs = [], {}
-        for p in self.params.values():
+        for p in spec.params.values():
             if p.index:
-                self.args.append(p.value)
-            elif p.value != Parameter.empty:
-                self.kwargs[p.name] = p.value
-        if '*' in self.kinds:
-            self.args += list(argv)
-            argv[:] = []
+                self.args.append(values[p.slot])
+            elif values[p.slot] is not Parameter.empty:
+                self.kwargs[p.name] = values[p.slot]
+        for p in self.unknown.values():
+            if values[p.slot] is not Parameter.empty:
+                self.kwargs[p.name] = values[p.slot]
+        if '*' in spec.kinds and not self.stopped:
+            self.args += argv.take()
+
+
+    def _param(self, k, last):
+        ''' Find the parameter for the keyword `k`, creating an unknown parameter if needed.
+        '''
+        param = self.spec.alias.get(k) or self.unknown.get(k)
+        if param: return param
+        param = ArgParam(name=k, aliases=[k], type=None if last else ArgType(bool), index=0,
+                    default=Parameter.empty, kind=Parameter.KEYWORD_ONLY, slot=len(self.values))
+        self.values.append(Parameter.empty)
+        self.unknown[k] = param
+        return param
 
 
     def _parse_kwargs(self, argv):
         ''' Try to take a keyword argument from argv
         '''
-        if not argv: return
-        if argv[0][0] != '-': return # A potential command name
-        if len(argv[0]) == 1: return argv.pop(0) and False # End of kwargs
-        if not ArgSpec.kw_re.match(argv[0]):
-            return self.error('BAD_KW', f"Invalid keyword argument \b1 {argv[0]}\b.")
-        arg = argv.pop(0)
-        dashes = 1 + int(arg[1] == '-')
-        arg = arg.rsplit('#',1)
-        arg, count = arg[0][dashes:], (arg[1] if len(arg) == 2 else False)
+        kind = argv.kind
+        if kind == None or kind == VALUE: return # A potential command name
+        if kind == TERM: return argv.advance() # End of kwargs
+        if kind != KEYWORD:
+            return self.error('BAD_KW', f"Invalid keyword argument \b1 {argv.head}\b.")
+        dashes, arg, count = argv.val
+        argv.advance()
         ks = [arg] if dashes==2 else list(arg)
         for i, k in enumerate(ks):
             if k == 'self':
@@ -287,11 +575,7 @@ class ArgSpec():
 
     def _parse_kwarg(self, k, kdash, last, argv, count):
         if count != False: kdash += f'#{count}'
-        if k in self.alias:
-            param = self.alias[k]
-        else: # Unknown parameter
-            param = ArgParam.new(self, name=k, aliases=[k], type=None if last else ArgType(bool))
-            self.unknown.append(param)
+        param = self._param(k, last)
         # Are we trying to use -k#3 with a non-repeated value?
         if count != False and param.type and not param.type.repeated:
             return self.error('NOT_LIST', f"Invalid array# parameter \b1 {kdash}\b for a non-list type \b2 {param.type}\b .")
@@ -303,35 +587,42 @@ class ArgSpec():
             self.error('BAD_LIST', f"Invalid array# parameter: \b1 {kdash}\b .")
         # If we know that we are a flag then don't bother to grab one
         if not last or param.type and param.type.is_flag:
-            param.set(True, kdash)
+            self.set(param, True, kdash)
             return True
         # We probably need a value so grab one
-        val = self._grab_one(argv)
+        val = argv.grab()
         if param.type == None:
             # We know the unknown parameter type now
             if val == None:
-                param.type = ArgType(bool)
-                param.set(True, kdash)
+                param['type'] = ArgType(bool)
+                self.set(param, True, kdash)
                 return True
-            param.type = ArgType([])
+            param['type'] = ArgType([])
         # Do we only need a single value?
         if count == False:
             if val == None: return self.error('KW_VAL_MISSING', f"Keyword parameter \b1 {kdash}\b  is missing a value.")
-            param.set(val, kdash)
+            self.set(param, val, kdash)
             return True
         # We want `need` values
         got = 0
         while True: # Grab multiple values for our array
             if val == None:
                 if need == INFINITY: # --key# terminated
-                    param.set(None, kdash)
+                    self.set(param, None, kdash)
                     break 
                 # Didn't get enough values
                 return self.error('LIST_TOO_FEW', f"Expected \b1 {need}\b  values but only received \b1 {got}\b .")
-            param.set(val, kdash)
+            if not self.set(param, val, kdash): return self.stop()
             got += 1
             if got == need: break
-            val = self._grab_one(argv)
+            if param.type.packed is not None: # Take plain values a chunk at a time
+                while got < need:
+                    vals = argv.values(min(need - got, Packed.CHUNK))
+                    if not vals: break
+                    if not self.extend(param, vals, kdash): return self.stop()
+                    got += len(vals)
+                if got == need: break
+            val = argv.grab()
         return True
 
 
@@ -339,40 +630,14 @@ class ArgSpec():
         ''' Try to take a positional argument from argv
         '''
         if param.name.startswith('_'): return
-        v = self._grab_one(argv)
+        v = argv.grab()
         if v == None: return
-        param.set(v, param.index)
+        if not self.set(param, v, param.index) and param.type.repeated: return self.stop()
         return True
 
 
-    def _grab_one(self, argv):
-        if not argv: return
-        arg = argv.pop(0)
-        if arg[0] == '-':
-            l = len(arg)
-            if l == 1: return # This indicates that arguments are done
-            if arg[1] not in '0123456789.': # Not negative number
-                argv.insert(0, arg[1:] if arg == '-'*l else arg)
-                return # A keyword parameter
-            # Negative number
-        if arg.startswith('\\'): arg = arg[1:]
-        return arg
-
-
-    def __pretty__(self, print, *, _depth, depth, **kwargs):
+    def __pretty__(self, print, **kwargs):
         print(f"\b1 {func_name(self.fn,'__qualname__')}[\b2 {' '.join(self.kinds)}\b ]\b3 {self.args or '()'}{self.kwargs or '{}'}")
-        tbl = Table(0,0,0,0,0)
-        tbl.cell("C0", just='>')
-        tbl.cell("C1", style='1', just='>')
-        tbl.cell("R0", style='w!')
-        tbl('Aliases\tName\tPos\tType\tDefault\t')
-        for v in self.params.values():
-            if v.name=='': continue # Skip help
-            tbl(' '.join(sorted(v.aliases)) if v.aliases else ' ', '\t')
-            tbl(v.name, '\t')
-            tbl(v.index or ' ', '\t')
-            tbl(v.type, '\t')
-            tbl(pretty('\br *req*' if v.default == Parameter.empty else v.default, _depth=_depth+1, depth=depth-1, **kwargs), '\t')
-        print(tbl)
+        self.spec.pretty_params(print, **kwargs)
         for e in self.errors:
             print(e[1])
@@ -0,0 +1,165 @@
+import re, sys, itertools
+
+# Token kinds
+VALUE = 'VALUE'     # A value (escaped values and negative numbers included)
+TERM = 'TERM'       # A single dash that ends the current list or section
+DASHES = 'DASHES'   # Two or more dashes: ends the positional section, then acts like one less dash
+KEYWORD = 'KEYWORD' # A keyword argument or a cluster of flags
+BAD = 'BAD'         # Starts with a dash, but isn't any of the above
+
+INFINITY = 1000000000000 # The number of values wanted by an unbounded ``--key#`` list (same as print_ext.widget.INFINITY)
+
+kw_re = re.compile(r'--?[a-zA-Z][-\w]*(#([1-9][0-9]*)?)?$')
+
+
+def classify(arg):
+    ''' Classify a single argv token.
+
+    Returns ``(kind, val)``.  For a `VALUE` the val is the value with a leading backslash removed.
+    For a `KEYWORD` it is ``(dashes, name, count)`` where count is ``False``, ``''`` or the digits after ``#``.
+    '''
+    if arg[:1] != '-':
+        return VALUE, (arg[1:] if arg[:1] == '\\' else arg)
+    l = len(arg)
+    if l == 1: return TERM, None
+    if arg[1] in '0123456789.':
+        try:
+            float(arg)
+            return VALUE, arg # Negative number
+        except ValueError:
+            return BAD, None # Such as -5x, which is still taken by `ArgvCursor.grab` (but isn't a keyword)
+    if arg == '-'*l: return DASHES, None
+    if not kw_re.match(arg): return BAD, None
+    dashes = 1 + int(arg[1] == '-')
+    arg = arg.rsplit('#',1)
+    return KEYWORD, (dashes, arg[0][dashes:], arg[1] if len(arg) == 2 else False)
+
+
+
+def read_args(path):
+    ''' Lazily yield the arguments in a response file (one per line), or stdin for ``-``.
+
+    Blank lines are skipped.  Use a single backslash for an empty argument.
+    '''
+    if path == '-':
+        yield from _arg_lines(sys.stdin)
+        return
+    try:
+        f = open(path)
+    except OSError as e:
+        from .exceptions import ArgFileError
+        raise ArgFileError(path=path, error=e)
+    with f:
+        yield from _arg_lines(f)
+
+
+
+def _arg_lines(f):
+    for line in f:
+        line = line.rstrip('\r\n')
+        if line: yield line
+
+
+
+def expand_args(argv):
+    ''' Replace every ``@path`` argument with the contents of the response file ``path``.
+    '''
+    for arg in argv:
+        if len(arg) > 1 and arg[0] == '@':
+            yield from read_args(arg[1:])
+        else:
+            yield arg
+
+
+
+class ArgvCursor():
+    ''' A forward-only cursor over the command line arguments.
+
+    The whole command chain shares one cursor so that argv is never copied or shifted.
+    Each token is classified once, when it becomes the `head`.
+
+    If `response_files` is set then ``@path`` arguments are expanded lazily as the cursor reaches them.
+    '''
+    __slots__ = ('_src', 'head', 'kind', 'val')
+
+    def __init__(self, argv, response_files=False):
+        self._src = expand_args(argv) if response_files else iter(argv)
+        self.advance()
+
+
+    def __bool__(self):
+        return self.head != None
+
+
+    def advance(self):
+        ''' Move on to the next token.
+        '''
+        self._set_head(next(self._src, None))
+
+
+    def _set_head(self, arg):
+        self.head = arg
+        self.kind, self.val = (None, None) if arg == None else classify(arg)
+
+
+    def grab(self):
+        ''' Try to take a single value.
+
+        Returns ``None`` if there isn't one.  A `TERM` is consumed and two or more dashes lose one dash.
+        '''
+        kind = self.kind
+        if kind == VALUE:
+            val = self.val
+            self.advance()
+            return val
+        if kind == BAD and self.head[1] in '0123456789.': # Looks like a negative number, such as -0x10
+            val = self.head
+            self.advance()
+            return val
+        if kind == TERM:
+            self.advance()
+        elif kind == DASHES:
+            self._set_head(self.head[1:])
+
+
+    def values(self, limit):
+        ''' Take up to `limit` values, stopping before anything that isn't a `VALUE`.
+
+        Plain values (that don't start with a dash or backslash) skip `classify`.
+        '''
+        vals = []
+        if self.kind != VALUE: return vals
+        vals.append(self.val)
+        src, append = self._src, vals.append
+        for _ in range(limit - 1):
+            arg = next(src, None)
+            if arg == None or arg[:1] in ('-', '\\', ''):
+                self._set_head(arg)
+                return vals
+            append(arg)
+        self.advance()
+        return vals
+
+
+    def rest(self, limit=None):
+        ''' The remaining raw tokens (at most `limit` of them), without consuming them.
+        '''
+        if self.head == None: return []
+        rest = [self.head]
+        rest.extend(itertools.islice(self._src, None if limit == None else limit-1))
+        self._src = itertools.chain(rest[1:], self._src)
+        return rest
+
+
+    def take(self):
+        ''' Consume and return the remaining raw tokens.
+        '''
+        if self.head == None: return []
+        rest = [self.head]
+        rest.extend(self._src)
+        self._set_head(None)
+        return rest
+
+
+    def __repr__(self):
+        return f"ArgvCursor({self.head!r}...)"
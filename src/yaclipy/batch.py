@@ -0,0 +1,139 @@
+''' Run many command lines against one command tree, in one process and one event loop.
+
+Each line of the input is one argv, either shell words or a JSON array of strings.
+Every line is bound and run in its own copy of the config context, and the result (or error) of each line
+is reported as a JSON object, in the order of the lines.  A line that fails doesn't stop the batch.
+
+    $ python -m yaclipy.batch myapp.cli:main lines.txt --jobs 8 > results.jsonl
+'''
+import sys, json, shlex
+from typing import Literal
+
+
+
+def parse(line, format='auto'):
+    ''' The argv of a single `line`.  Returns None for a blank line or a ``#`` comment.
+
+    With the ``auto`` format a line that starts with ``[`` is a JSON array, and anything else is split like a shell would.
+    '''
+    line = line.strip()
+    if not line or line[0] == '#': return None
+    if format == 'json' or (format == 'auto' and line[0] == '['):
+        argv = json.loads(line)
+        if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv): raise ValueError(f"Not a JSON array of strings: {line}")
+        return argv
+    return shlex.split(line)
+
+
+
+def read(lines, format='auto'):
+    ''' Yield ``(line_number, argv, error)`` for each of the `lines` (numbered from 1) that isn't blank.
+    '''
+    for n, line in enumerate(lines, 1):
+        try:
+            argv = parse(line, format)
+            if argv != None: yield n, argv, None
+        except ValueError as e:
+            yield n, None, e
+
+
+
+def _error(record, e):
+    from print_ext import Printer, StringIO, PrettyException
+    from .exceptions import CmdError
+    record.update(ok=False, error=e.__class__.__name__)
+    if isinstance(e, CmdError):
+        record['errors'] = [str(err) for err in getattr(e, 'errors', [])]
+        record['message'] = record['errors'][0] if record['errors'] else record['error']
+    elif isinstance(e, PrettyException):
+        print = Printer.using(StringIO)(ascii=True, color=False)
+        print.pretty(e)
+        record['message'] = str(print).rstrip()
+    else:
+        record['message'] = str(e)
+    return record
+
+
+
+async def _one(cmd, n, argv, error, options):
+    record = {'line': n, 'argv': argv}
+    try:
+        if error: raise error
+        record.update(ok=True, result=await cmd(argv).run(show=False, **options))
+    except (Exception, SystemExit) as e:
+        _error(record, e)
+    return record
+
+
+
+async def run_many_async(root, lines, *, format='auto', jobs=1, **options):
+    ''' Bind and run each of the `lines` against the command `root` (a Command, function or "module:attr").
+
+    Yields a record (a dict) for each line in order:
+    ``{"line": n, "argv": [...], "ok": true, "result": ...}`` or ``{"line": n, "argv": [...], "ok": false, "error": "CallError", "message": "...", ...}``.
+    Up to `jobs` lines are run at once.  The `options` are given to `BoundInvocation.run`.
+    '''
+    import asyncio, collections
+    from .command import Command
+    from .config import copy_config
+    cmd = root if isinstance(root, Command) else Command(root)
+    loop = asyncio.get_running_loop()
+    window = collections.deque()
+    try:
+        for n, argv, error in read(lines, format):
+            if len(window) >= max(jobs, 1): yield await window.popleft()
+            # The task runs in a copy of its own config context
+            window.append(copy_config().run(loop.create_task, _one(cmd, n, argv, error, options)))
+        while window: yield await window.popleft()
+    finally:
+        for t in window: t.cancel()
+
+
+
+def run_many(root, lines, *, report=None, **kwargs):
+    ''' Run each of the `lines` with `run_many_async` in a new event loop.
+
+    `report` is called with the record of each line, in order.  Returns the number of lines that failed.
+    '''
+    import asyncio
+    async def main():
+        failed = 0
+        async for record in run_many_async(root, lines, **kwargs):
+            failed += not record['ok']
+            if report: report(record)
+        return failed
+    return asyncio.run(main())
+
+
+
+def batch(root, path='-', *, format__f:Literal['auto','shell','json']='auto', jobs__j=1):
+    ''' Run each line of a file as a command line, and print the results as JSON lines.
+
+    Parameters:
+        <module:function>
+            The root command
+        <path>
+            The file of command lines (default: stdin)
+        --format <auto|shell|json>, -f <auto|shell|json>
+            How the lines are split.  ``auto`` reads a line that starts with ``[`` as a JSON array.
+        --jobs <n>, -j <n>
+            The number of lines to run at once
+    '''
+    out = sys.stdout
+    def report(record):
+        out.write(json.dumps(record, default=repr) + '\n')
+    if path == '-': return run_many(root, sys.stdin, report=report, format=format__f, jobs=jobs__j)
+    with open(path) as f:
+        return run_many(root, f, report=report, format=format__f, jobs=jobs__j)
+
+
+
+if __name__ == '__main__':
+    from print_ext import Printer, PrettyException
+    from .command import Command
+    try:
+        cmd = Command(batch)(sys.argv[1:])
+    except PrettyException as e:
+        Printer().pretty(e)
+        sys.exit(2)
+    sys.exit(1 if batch(*cmd.run_spec.args, **cmd.run_spec.kwargs) else 0) # Not from Command.run(), which doesn't give the exit status
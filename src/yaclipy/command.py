@@ -1,10 +1,24 @@
-import sys, inspect, asyncio
+import sys, inspect, importlib, contextvars
+from bisect import bisect_left
+from collections.abc import Mapping
 from inspect import Parameter
-from print_ext import Printer, Line
 from functools import partial
-from .arg_spec import ArgSpec, sig_kinds, func_name
-from .exceptions import AmbiguousCommand, CommandNotFound, CallError, CmdHelp
-from .docs import CmdDoc
+from time import perf_counter
+from .arg_spec import spec_of, func_name
+from .argv import ArgvCursor
+from .hooks import HOOKS, emit, yields, ayields
+
+# asyncio, print_ext, docstring_parser and the exceptions are imported when they are needed,
+# so that a successful call only pays for importing what it uses.
+
+
+def __getattr__(name):
+    # The exceptions used to be imported here
+    if name in ('AmbiguousCommand', 'CommandNotFound', 'CallError', 'CmdHelp'):
+        from . import exceptions
+        return getattr(exceptions, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 
 def sub_cmds(*args, **kwargs):
@@ -15,74 +29,472 @@ def sub_cmds(*args, **kwargs):
 
     The sub commands can be defined as positional parameters, in which case the command name will be the function.__name__.
     If the subcommand is specified as a keyword parameter then the name is used as an alias to the function.
+
+    A sub command can also be given as a ``"package.module:function"`` string.
+    The module is only imported when that sub command is used, or its documentation is shown.
+    '''
+    def _f(fn):
+        cmds = {cmd.real_name:cmd for cmd in [Command(fn) for fn in args]}
+        cmds.update({name:Command(fn,name) for name,fn in kwargs.items()})
+        fn._sub_cmds = SubCommands(cmds, cmds.__getitem__)
+        return fn
+    return _f
+
+
+
+def jobs(n):
+    ''' Use this decorator to run the sub-command chain for up to `n` of a generator's values at once.
+
+    The results keep the order that the values were yielded in.
+    This overrides the ``jobs`` given to `BoundInvocation.run`.
+    '''
+    def _f(fn):
+        fn._jobs = n
+        return fn
+    return _f
+
+
+
+def processes(n=None, *, chunksize=1, ordered=True):
+    ''' Use this decorator to run the sub-command chain for a generator's values in `n` worker processes (default: one per core).
+
+    The bound sub-commands are pickled, so they must be importable functions or methods.
+    Values are sent to the workers `chunksize` at a time.
+    With `ordered` the results keep the order that the values were yielded in, otherwise they are in the order they finish.
+    '''
+    def _f(fn):
+        fn._processes = (n, chunksize, ordered)
+        return fn
+    return _f
+
+
+
+def pipeline(buffer=16):
+    ''' Use this decorator to run an async generator in its own task, up to `buffer` values ahead of its sub-commands.
+
+    This overrides the ``buffer`` given to `BoundInvocation.run`.
     '''
     def _f(fn):
-        fn._sub_cmds = {cmd.real_name:cmd for cmd in [Command(fn) for fn in args]}
-        fn._sub_cmds.update({name:Command(fn,name) for name,fn in kwargs.items()})
+        fn._buffer = buffer
         return fn
     return _f
 
 
 
+def blocking(fn):
+    ''' Use this decorator on a synchronous command that blocks (on subprocesses, files, ...).
+
+    It is run in a thread (see `BoundInvocation.run`), so it doesn't stall the event loop,
+    and the async commands in the chain (and other values of a ``jobs`` fan-out) keep running.
+    For a generator, each value is generated in a thread.
+    '''
+    fn._blocking = True
+    return fn
+
+
+
+def resolve(ref):
+    ''' Import the object referred to by ``"package.module:attr"``.
+    '''
+    module, _, attr = ref.partition(':')
+    obj = importlib.import_module(module)
+    for a in attr.split('.') if attr else []:
+        obj = getattr(obj, a)
+    return obj
+
+
+
+def command_name(name):
+    return (name[:-1] if name[-1]=='_' else name).replace('_','-')
+
+
+
+def _count(acc, val):
+    return acc + 1
+
+
+def _sum(acc, val):
+    return acc + val
+
+
+
+CANCEL_FUTURES = sys.version_info >= (3, 9) # Executor.shutdown(cancel_futures=) is new in 3.9
+
+
+
+class Run():
+    ''' The options and state of a single `BoundInvocation.run`.
+
+    `reduce` folds each final result of the chain into `value` with ``reduce(value, result)``, starting from `initial`.
+    It can also be ``'count'`` or ``'sum'``, which start from 0.
+    '''
+    __slots__ = ('jobs', 'stream', 'fold', 'value', 'offload', 'threads', 'buffer', 'show', 'output', 'sink', 'executors')
+    REDUCERS = {'count': _count, 'sum': _sum}
+
+    def __init__(self, jobs=1, stream=False, reduce=None, initial=None, offload=False, threads=None, buffer=0, show=True, output=None):
+        self.jobs = jobs
+        self.show = show
+        self.output = output
+        self.sink = None
+        self.buffer = buffer
+        self.offload = offload
+        self.threads = threads
+        self.stream = stream or reduce != None
+        if isinstance(reduce, str):
+            reduce = self.REDUCERS[reduce]
+            if initial == None: initial = 0
+        self.fold = reduce
+        self.value = initial
+        self.executors = {}
+
+
+    def executor(self, cls, n):
+        ''' The `cls` executor with `n` workers, shared by the whole run.
+        '''
+        try:
+            return self.executors[cls, n]
+        except KeyError:
+            pool = self.executors[cls, n] = cls(n)
+            return pool
+
+
+    def emit(self, val):
+        ''' Write a final result to the `output` sink (see `yaclipy.output`).
+        '''
+        if self.sink == None:
+            from .output import sink
+            self.sink = sink(self.output)
+        self.sink.write(val)
+
+
+    def close(self):
+        for pool in self.executors.values():
+            if CANCEL_FUTURES:
+                pool.shutdown(cancel_futures=True)
+            else: # Work that is still queued runs before this returns
+                pool.shutdown()
+        self.executors.clear()
+        if self.sink != None: self.sink.flush()
+
+
+
+def _collect(acc, val):
+    acc.append(val)
+    return acc
+
+
+
+def _work(bound, values, jobs, stream, keep):
+    ''' Run the `bound` chain for each of the `values` in a worker process.
+
+    Returns the (result, final results) of each chain, where the result is None when streaming.
+    Nothing is shown here: the parent writes the final results to its own sink, unless `keep` is false.
+    A `PrettyException` that can't be pickled is sent back as a `WorkerError`.
+    '''
+    import asyncio, pickle
+    from print_ext import PrettyException
+    results = []
+    try:
+        for y in values:
+            run = Run(jobs, stream=stream, show=False)
+            if keep: run.fold, run.value = _collect, []
+            val = asyncio.run(bound._start(y, run))
+            results.append((None if stream else val, run.value or []))
+    except PrettyException as e:
+        try:
+            pickle.loads(pickle.dumps(e))
+        except Exception:
+            from .exceptions import WorkerError
+            raise WorkerError.of(e) from None
+        raise
+    return results
+
+
+
+def _rebind(fn, name, method, args, kwargs, next_cmd):
+    from .arg_spec import ArgBind
+    cmd = Command(fn, name, method)
+    spec = ArgBind(cmd.argspec)
+    spec.args, spec.kwargs = args, kwargs
+    return BoundInvocation(cmd, spec, next_cmd)
+
+
+
+ASYNC_KINDS = frozenset(['coroutinefunction', 'asyncgenfunction'])
+LOOP_ATTRS = ('_jobs', '_processes', '_blocking') # Decorators that need an event loop
+ASYNC_GEN = frozenset(['asyncgenfunction'])
+
+
+async def _in_thread(pool, fn, *args, **kwargs):
+    import asyncio, contextvars
+    ctx = contextvars.copy_context() # So that the config is the same
+    return await asyncio.get_running_loop().run_in_executor(pool, partial(ctx.run, fn, *args, **kwargs))
+
+
+async def _thread_iter(pool, values):
+    import asyncio, contextvars
+    ctx, loop, done = contextvars.copy_context(), asyncio.get_running_loop(), object()
+    while True:
+        y = await loop.run_in_executor(pool, ctx.run, next, values, done)
+        if y is done: return
+        yield y
+
+
+
+class Prefetch():
+    ''' Iterate the async iterator `values` in its own task, which runs up to `size` values ahead.
+
+    An exception from `values` is raised when its turn comes.
+    `cancel` stops the task (and closes `values`) when the consumer is done early.
+    '''
+    def __init__(self, values, size):
+        import asyncio
+        self.queue = asyncio.Queue(size)
+        self.task = asyncio.ensure_future(self._produce(values))
+
+
+    async def _produce(self, values):
+        import asyncio
+        try:
+            async for y in values: await self.queue.put((True, y))
+            await self.queue.put((False, None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self.queue.put((False, e))
+        finally:
+            if hasattr(values, 'aclose'): await values.aclose()
+
+
+    def __aiter__(self):
+        return self
+
+
+    async def __anext__(self):
+        more, y = await self.queue.get()
+        if more: return y
+        if y == None: raise StopAsyncIteration
+        raise y
+
+
+    def cancel(self):
+        self.task.cancel()
+
+
+
+async def _aiter(values):
+    for y in values:
+        yield y
+
+
+
+class SubCommands(Mapping):
+    ''' The sub-commands of a command, keyed by their real names.
+
+    The command names are kept sorted so that a typed prefix is resolved with a bisect.
+    A `Command` is only created (and its signature analysed) when it is looked up.
+    If `check` is set then commands without a signature are left out.
+    '''
+    def __init__(self, names, get, check=False):
+        self._get = get
+        self._check = check
+        self._cmds = {}
+        self._index = sorted((command_name(name), name) for name in names)
+        self._names = [name for name, _ in self._index]
+        self._real_names = frozenset(name for _, name in self._index)
+
+
+    def command(self, real_name):
+        try:
+            return self._cmds[real_name]
+        except KeyError:
+            pass
+        try:
+            cmd = self._get(real_name)
+        except AttributeError:
+            cmd = None
+        if self._check and cmd != None and not cmd: cmd = None
+        self._cmds[real_name] = cmd
+        return cmd
+
+
+    def lookup(self, prefix):
+        ''' All of the commands whose name starts with `prefix`.
+        '''
+        found = {}
+        for i in range(bisect_left(self._names, prefix), len(self._names)):
+            if not self._names[i].startswith(prefix): break
+            real_name = self._index[i][1]
+            cmd = self.command(real_name)
+            if cmd != None: found[real_name] = cmd
+        return found
+
+
+    def __getitem__(self, real_name):
+        cmd = self.command(real_name) if real_name in self._real_names else None
+        if cmd == None: raise KeyError(real_name)
+        return cmd
+
+
+    def __iter__(self):
+        for _, real_name in self._index:
+            if self.command(real_name) != None: yield real_name
+
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+    def __bool__(self):
+        return bool(self._index)
+
+
+
 class Command():
 
     def __init__(self, fn, name=None, method=False):
-        if name == None: name = func_name(fn)
+        if isinstance(fn, str): # A "module:attr" reference that is imported on demand
+            self.ref = fn
+            if name == None: name = fn.rpartition(':')[2].rpartition('.')[2]
+        else:
+            self.ref = None
+            self._fn = fn
+            if name == None: name = func_name(fn)
         self.real_name = name
-        self.name = (name[:-1] if name[-1]=='_' else name).replace('_','-')
-        self.fn = fn
-        self.next_cmd = None
-        self.run_spec = None
+        self.name = command_name(name)
         self.is_method = method
 
     def __bool__(self):
         return bool(self.argspec)
 
+
+    @property
+    def fn(self):
+        if not hasattr(self, '_fn'):
+            self._fn = resolve(self.ref)
+        return self._fn
+
     
     @property
     def argspec(self):
         if not hasattr(self, '_argspec'):
-            self._argspec = ArgSpec(self.fn, self.is_method)
+            self._argspec = spec_of(self.fn)
         return self._argspec
     
 
-    def __call__(self, argv):
-        argv = list(argv)
-        self.run_spec = self.argspec(argv)
-        if '' in self.run_spec.kwargs: raise CmdHelp(cmd=self)
+    def __call__(self, argv, *, response_files=False):
+        ''' Bind `argv` to this command and the chain of sub-commands that follows it.
+
+        Returns a `BoundInvocation`.  The command itself is not modified, so it can be shared.
+        '''
+        if not isinstance(argv, ArgvCursor): argv = ArgvCursor(argv, response_files)
+        if HOOKS: t = [perf_counter(), self.argspec, perf_counter()]
+        run_spec = self.argspec(argv)
+        if HOOKS: t.append(perf_counter())
+        bound = BoundInvocation(self, run_spec)
+        if '' in run_spec.kwargs:
+            from .exceptions import CmdHelp
+            raise CmdHelp(cmd=bound)
         cmds = self.sub_cmds()
-        if argv and not cmds:
-            self.run_spec.error('UNUSED', f"Unused trailing parameters: \b1 {argv!r}")
-        if self.run_spec.errors: raise CallError(self)
-        if not argv: return self
+        if argv and not cmds and not run_spec.stopped:
+            unused = argv.rest(11)
+            if len(unused) > 10: unused[10:] = ['...']
+            run_spec.error('UNUSED', f"Unused trailing parameters: \b1 {unused!r}")
+        if run_spec.errors:
+            from .exceptions import CallError
+            raise CallError(bound)
+        if not argv:
+            if HOOKS: emit('on_bind', self, run_spec, {'signature': t[2]-t[0], 'bind': t[3]-t[2], 'lookup': 0.0})
+            return bound
         # Lookup sub-command
-        cmd_name = argv[0].replace('_','-')
-        cmds = {name:dfn for name, dfn in cmds.items() if dfn.name.startswith(cmd_name)}
-        if not cmds:
-            raise CommandNotFound(cmd=self, errors = [
+        cmd_name = argv.head.replace('_','-')
+        argv.advance()
+        found = cmds.lookup(cmd_name)
+        if not found:
+            from difflib import get_close_matches
+            from print_ext import Line
+            from .exceptions import CommandNotFound
+            close = get_close_matches(cmd_name, [cmd.name for cmd in cmds.values()])
+            raise CommandNotFound(cmd=bound, errors = [
                 Line(f"Command not found: \b1 {cmd_name}"),
-                Line("Valid commands are listed above."),
+                Line("Did you mean: ", ', '.join(f'\b1 {x}\b ' for x in close)) if close else Line("Valid commands are listed above."),
             ])
+        cmds = found
         if len(cmds) > 1:
-            raise AmbiguousCommand(cmd=self, errors = [
+            from print_ext import Line
+            from .exceptions import AmbiguousCommand
+            raise AmbiguousCommand(cmd=bound, errors = [
                 Line(f"Ambiguous \b1 {cmd_name}\b  matched multiple commands: ", ', '.join(f'\b1 {x}\b ' for x in cmds))
             ])
-        self.next_cmd = next(iter(cmds.values()))(argv[1:])
-        return self
+        sub = next(iter(cmds.values()))
+        if HOOKS: emit('on_bind', self, run_spec, {'signature': t[2]-t[0], 'bind': t[3]-t[2], 'lookup': perf_counter()-t[3]})
+        return BoundInvocation(self, run_spec, sub(argv))
+
+
+    def doc(self, check=False):
+        if not hasattr(self, '_doc'):
+            from .docs import CmdDoc
+            self._doc = CmdDoc(inspect.getdoc(self.fn) or '')
+        return self._doc
+
+
+    def __pretty__(self, print, **kwargs):
+        print(f"Command({self.name!r})")
+        print.pretty(self.argspec)
+        for sub in self.sub_cmds().values():
+            print(' * ',sub.name)
+
+
+    def sub_cmds(self):
+        if hasattr(self.fn, '_sub_cmds'): return self.fn._sub_cmds
+        if not hasattr(self, '_sub_cmds'):
+            retval = self.argspec.retval
+            if retval is Parameter.empty:
+                self._sub_cmds = SubCommands([], None)
+            else:
+                names = [name for name in dir(retval) if not name.startswith('_')]
+                self._sub_cmds = SubCommands(names, lambda name: Command(getattr(retval, name), name), check=True)
+        return self._sub_cmds
+
 
 
-    async def _run(self, input=None):
+class BoundInvocation():
+    ''' A `Command` bound to its part of an argv, followed by the rest of the bound chain (`next_cmd`).
+
+    It is never modified after it is created, so it can be run any number of times, from many tasks or threads at once.
+    Everything else (name, doc(), sub_cmds(), ...) comes from the command.
+
+    `sync` is set if the whole chain can be run without an event loop.
+    '''
+    __slots__ = ('cmd', 'run_spec', 'next_cmd', 'sync')
+
+    def __init__(self, cmd, run_spec, next_cmd=None):
+        self.cmd = cmd
+        self.run_spec = run_spec
+        self.next_cmd = next_cmd
+        fn = run_spec.fn
+        self.sync = (not run_spec.kinds & ASYNC_KINDS and not any(hasattr(fn, a) for a in LOOP_ATTRS)
+            and (next_cmd == None or next_cmd.sync))
+
+
+    def __getattr__(self, name):
+        if name == 'cmd': raise AttributeError(name)
+        return getattr(self.cmd, name)
+
+
+    def _args(self, input):
+        ''' The arguments to call the function with, given the `input` from the previous command.
+        '''
         spec = self.run_spec
         args = list(spec.args)
         kwargs = dict(spec.kwargs)
-        sub_self = Parameter.empty
         if hasattr(input, 'items'):
             # Prune input to filter out un-acceptable values
             for k,v in input.items():
                 if '**' not in spec.kinds:
                     if k not in spec.params: continue
                     if spec.params[k].kind == Parameter.POSITIONAL_ONLY: continue
-                if kwargs.get(k, Parameter.empty) != Parameter.empty: continue
+                if kwargs.get(k, Parameter.empty) is not Parameter.empty: continue
                 kwargs[k] = v
         if '_input' in spec.params and spec.params['_input'].kind == Parameter.KEYWORD_ONLY:
             kwargs['_input'] = input
@@ -90,61 +502,264 @@ class Command():
         # Fill in positional empty values
         for p in spec.params.values():         
             if not p.index: break
-            if args[p.index-1] != Parameter.empty:
+            if args[p.index-1] is not Parameter.empty:
                 if p.name in kwargs: del kwargs[p.name]
                 continue
             kwargs.setdefault(p.name, p.default)
             if p.name not in kwargs: raise TypeError(f"No value supplied for {p.ordinal} positional parameter '{p.name}'")
             args[p.index-1] = kwargs.pop(p.name)
-        # Make the call
-        #print(f"CALL {self.name} -- {spec.kinds}")
-        val = self.fn(*args, **kwargs)
-        if 'generatorfunction' in spec.kinds:
-            return [await self._call_next(y) for y in val]
-        elif 'coroutinefunction' in spec.kinds:
-            return await self._call_next(await val)
-        elif 'asyncgenfunction' in spec.kinds:
-            return [await self._call_next(y) async for y in val]
+        return args, kwargs
+
+
+    def _run_sync(self, input, run):
+        ''' Run the chain without an event loop.  Only for a `sync` chain.
+        '''
+        link = self
+        while not HOOKS:
+            args, kwargs = link._args(input)
+            val = link.fn(*args, **kwargs)
+            if 'generatorfunction' in link.run_spec.kinds: return link._each_sync(val, run)
+            if link.next_cmd == None: return link._finish(val, run)
+            link, input = link.next_cmd, val
+        return link._run_sync_hooked(input, run)
+
+
+    def _run_sync_hooked(self, input, run):
+        emit('on_call_start', self, input)
+        t = perf_counter()
+        try:
+            args, kwargs = self._args(input)
+            val = self.fn(*args, **kwargs)
+            if 'generatorfunction' in self.run_spec.kinds: return self._each_sync(yields(self, val), run)
+            if self.next_cmd == None: return self._finish(val, run)
+            return self.next_cmd._run_sync(val, run)
+        finally:
+            emit('on_call_end', self, perf_counter() - t, sys.exc_info()[1])
+
+
+    def _each_sync(self, values, run):
+        step = self._finish if self.next_cmd == None else self.next_cmd._run_sync
+        if run.stream:
+            for y in values: step(y, run)
+            return
+        return [step(y, run) for y in values]
+
+
+    async def _run(self, input, run):
+        if not HOOKS: return await self._call(input, run)
+        emit('on_call_start', self, input)
+        t = perf_counter()
+        try:
+            return await self._call(input, run)
+        finally:
+            emit('on_call_end', self, perf_counter() - t, sys.exc_info()[1])
+
+
+    async def _call(self, input, run):
+        spec = self.run_spec
+        args, kwargs = self._args(input)
+        fn, kinds = self.fn, spec.kinds
+        if getattr(fn, '_blocking', run.offload) and not kinds & ASYNC_KINDS:
+            from concurrent.futures import ThreadPoolExecutor
+            threads = run.executor(ThreadPoolExecutor, run.threads)
+            if 'generatorfunction' in kinds:
+                val, kinds = _thread_iter(threads, fn(*args, **kwargs)), ASYNC_GEN
+            else:
+                val = await _in_thread(threads, fn, *args, **kwargs)
+        else:
+            val = fn(*args, **kwargs)
+        if 'coroutinefunction' in kinds:
+            return await self._call_next(await val, run)
+        elif 'generatorfunction' in kinds:
+            return await self._each(yields(self, val) if HOOKS else val, fn, run)
+        elif 'asyncgenfunction' in kinds:
+            if HOOKS: val = ayields(self, val)
+            buffer = getattr(fn, '_buffer', run.buffer)
+            if not buffer: return await self._each_async(val, fn, run)
+            val = Prefetch(val, buffer)
+            try:
+                return await self._each_async(val, fn, run)
+            finally:
+                val.cancel()
         else:
-            return await self._call_next(val)
-        
+            return await self._call_next(val, run)
+
+
+    async def _each(self, values, fn, run):
+        ''' Call the next command for each of a generator's `values`.
+        '''
+        pool = getattr(fn, '_processes', None) if self.next_cmd != None else None
+        if pool: return await self._fan_out_processes(_aiter(values), *pool, run)
+        n = getattr(fn, '_jobs', run.jobs)
+        if n > 1: return await self._fan_out(_aiter(values), n, run)
+        if run.stream:
+            for y in values: await self._call_next(y, run)
+            return
+        return [await self._call_next(y, run) for y in values]
+
+
+    async def _each_async(self, values, fn, run):
+        ''' Call the next command for each of an async generator's `values`.
+        '''
+        pool = getattr(fn, '_processes', None) if self.next_cmd != None else None
+        if pool: return await self._fan_out_processes(values, *pool, run)
+        n = getattr(fn, '_jobs', run.jobs)
+        if n > 1: return await self._fan_out(values, n, run)
+        if run.stream:
+            async for y in values: await self._call_next(y, run)
+            return
+        return [await self._call_next(y, run) async for y in values]
 
-    async def _call_next(self, val):
-        if self.next_cmd == None:
-            if val != None: Printer().pretty(val)
-            return val
-        return await self.next_cmd._run(val)
 
+    async def _fan_out(self, values, n, run):
+        ''' Call the next command for each of the `values`, running at most `n` at once.
 
-    def run(self, input=None):
+        The first failure cancels the calls that are still running, and is raised.
+        '''
+        import asyncio
+        calls, running = [], set()
+        try:
+            async for y in values:
+                if len(running) >= n:
+                    done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for t in done: t.result()
+                t = asyncio.ensure_future(self._call_next(y, run))
+                if not run.stream: calls.append(t)
+                running.add(t)
+            while running:
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_EXCEPTION)
+                for t in done: t.result()
+        except BaseException:
+            for t in running: t.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            raise
+        if not run.stream: return [t.result() for t in calls]
+
+
+    async def _fan_out_processes(self, values, n, chunksize, ordered, run):
+        ''' Run the rest of the chain for each of the `values` in a pool of `n` processes.
+
+        At most two chunks per process are queued, so the values don't all have to be generated up front.
+        '''
+        import asyncio, os
+        from concurrent.futures import ProcessPoolExecutor
+        n = n or os.cpu_count() or 1
+        loop = asyncio.get_running_loop()
+        pool = run.executor(ProcessPoolExecutor, n)
+        last = self.next_cmd
+        while last.next_cmd != None: last = last.next_cmd
+        keep = run.show or run.fold != None
+        results, running = [], [] # Chunks in the order they were submitted
+        def collect(chunk):
+            for val, leaves in chunk:
+                if not run.stream: results.append(val)
+                for v in leaves: last._finish(v, run)
+        async def wait(block):
+            if ordered:
+                done = [running[0]] if block or running[0].done() else []
+                if block: await running[0]
+            else:
+                done = [t for t in running if t.done()]
+                if block and not done:
+                    done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                running.remove(t)
+                collect(t.result())
+        try:
+            chunk = []
+            async for y in values:
+                chunk.append(y)
+                if len(chunk) < chunksize: continue
+                while len(running) >= 2*n: await wait(True)
+                running.append(loop.run_in_executor(pool, _work, self.next_cmd, chunk, run.jobs, run.stream, keep))
+                chunk = []
+                await wait(False)
+            if chunk: running.append(loop.run_in_executor(pool, _work, self.next_cmd, chunk, run.jobs, run.stream, keep))
+            while running: await wait(True)
+        except BaseException:
+            for t in running: t.cancel()
+            raise
+        if not run.stream: return results
+
+
+    def _finish(self, val, run):
+        ''' Show a final result of the chain.
+        '''
+        if val is not None and run.show:
+            if HOOKS:
+                t = perf_counter()
+                run.emit(val)
+                emit('on_output', self, val, perf_counter() - t)
+            else:
+                run.emit(val)
+        if run.fold != None: run.value = run.fold(run.value, val)
+        return val
+
+
+    async def _call_next(self, val, run):
+        if self.next_cmd == None: return self._finish(val, run)
+        return await self.next_cmd._run(val, run)
+
+
+    async def _start(self, input, run):
+        try:
+            val = await self._run(input, run)
+        finally:
+            run.close()
+        return run.value if run.stream else val
+
+
+    def _start_sync(self, input, run):
+        try:
+            val = self._run_sync(input, run)
+        finally:
+            run.close()
+        return run.value if run.stream else val
+
+
+    def __reduce__(self):
+        # Sent to worker processes as the command's function (or "module:attr"), its bound arguments and the rest of the chain
+        cmd, spec = self.cmd, self.run_spec
+        return _rebind, (cmd.ref or cmd.fn, cmd.real_name, cmd.is_method, spec.args, spec.kwargs, self.next_cmd)
+
+
+    def run(self, input=None, *, jobs=1, stream=False, reduce=None, initial=None, offload=False, threads=None, buffer=0, show=True, output=None):
+        ''' Run the chain.
+
+        The final results are written to the `output` sink (see `yaclipy.output`), unless `show` is off.
+
+        Every generator in the chain (without its own `yaclipy.jobs`) calls the next command for up to `jobs` values at once.
+
+        Normally a generator returns the list of its sub-command's results.
+        With `stream` the results are only shown, and not kept, so memory doesn't grow with the number of values.
+        The chain then returns None, or the results folded by `reduce` (see `Run`), which implies `stream`.
+
+        Synchronous commands that are marked with `yaclipy.blocking` (or all of them with `offload`)
+        are run in a pool of `threads` threads, so they don't block the async commands.
+
+        With a `buffer` every async generator (without its own `yaclipy.pipeline`) runs in its own task,
+        up to `buffer` values ahead of the rest of the chain.
+
+        A `sync` chain is run without an event loop, unless it's run from one (a task is returned then) or needs one for `jobs` or `offload`.
+        Either way it runs in a copy of the caller's context, so the config (or any ContextVar) that it sets doesn't leak out.
+        '''
+        run = Run(jobs, stream, reduce, initial, offload, threads, buffer, show, output)
+        if self.sync and jobs <= 1 and not offload and 'asyncio' not in sys.modules:
+            return contextvars.copy_context().run(self._start_sync, input, run)
+        import asyncio
         try:
             loop = asyncio.get_running_loop()
         except RuntimeError:
             loop = None
         if loop:
-            return loop.create_task(self._run(input), name=self.name)
+            return loop.create_task(self._start(input, run), name=self.name)
+        elif self.sync and jobs <= 1 and not offload:
+            return contextvars.copy_context().run(self._start_sync, input, run)
         else:
-            return asyncio.run(self._run(input))
-        
-
-
-    def doc(self, check=False):
-        if not hasattr(self, '_doc'):
-            self._doc = CmdDoc(inspect.getdoc(self.fn) or '')
-        return self._doc
+            return asyncio.run(self._start(input, run))
 
 
     def __pretty__(self, print, **kwargs):
         print(f"Command({self.name!r})")
-        print.pretty(self.run_spec or self.argspec)
-        for sub in self.sub_cmds().values():
-            print(' * ',sub.name)
-
-
-    def sub_cmds(self):
-        if hasattr(self.fn, '_sub_cmds'): return self.fn._sub_cmds
-        retval = self.argspec.retval
-        if retval == Parameter.empty: return {}
-        dfns = {name:Command(getattr(retval,name), name) for name in dir(retval) if not name.startswith('_')}
-        return {name:dfn for name,dfn in dfns.items() if dfn}
-
+        print.pretty(self.run_spec)
+        if self.next_cmd != None: print.pretty(self.next_cmd)
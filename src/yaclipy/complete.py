@@ -0,0 +1,197 @@
+''' Shell completion that is answered from a manifest (see `yaclipy.manifest`).
+
+A completion request only reads the manifest, so none of the commands (or even the rest of yaclipy) are imported.
+The argv is walked with the same rules as `Command.__call__` and `ArgBind.arg_bind`:
+positional values first, then keywords (``--long``, ``-s``, clustered short flags and ``--key#N`` lists),
+then a sub-command, which can be any unambiguous prefix.
+
+    $ python -m yaclipy.complete script bash myapp myapp.manifest myapp.cli:main >> ~/.bashrc
+'''
+import os, sys, json, shlex
+from bisect import bisect_left
+from .argv import ArgvCursor, VALUE, TERM, KEYWORD, INFINITY
+from .sources import changed, MANIFEST_VERSION as VERSION
+
+
+
+class Node():
+    ''' The completion index of a single manifest node.
+    '''
+    __slots__ = ('positional', 'alias', 'names', 'subs', 'sub')
+
+    def __init__(self, node):
+        self.positional = []
+        self.alias = {'help': None, 'h': None} # The help flag
+        for p in node['params']:
+            if p.get('type') == None: continue # *args or **kwargs
+            if p['kind'] in ('POSITIONAL_ONLY', 'POSITIONAL_OR_KEYWORD'): self.positional.append(p)
+            for a in p['aliases']: self.alias[a] = p
+        self.names = sorted(self.alias)
+        self.sub = node['sub']
+        self.subs = sorted(((real_name[:-1] if real_name[-1]=='_' else real_name).replace('_','-'), real_name) for real_name in node['sub'])
+
+
+    def lookup(self, prefix):
+        ''' The (name, real_name) of each sub-command that starts with `prefix`.
+        '''
+        found = []
+        for i in range(bisect_left(self.subs, (prefix, '')), len(self.subs)):
+            if not self.subs[i][0].startswith(prefix): break
+            found.append(self.subs[i])
+        return found
+
+
+
+def is_flag(p):
+    return p == None or (p['type'] == 'bool' and not p['repeated'])
+
+
+
+class Completer():
+    ''' Completes the last word of an argv using the manifest `data`.
+    '''
+    def __init__(self, data):
+        self.data = data
+        self._nodes = {}
+
+
+    @classmethod
+    def load(cls, path, root=None):
+        ''' Load the manifest at `path`.
+
+        If it is missing or stale then it is rebuilt from `root` (a "module:attr"), which imports the command tree once.
+        Without a `root` a stale manifest is still used, and None is returned if there isn't one.
+        '''
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get('version') != VERSION: raise ValueError(path)
+            if root == None or not changed(data['sources']): return cls(data)
+        except (OSError, ValueError):
+            if root == None: return None
+        from .manifest import Manifest
+        return cls(Manifest.cached(root, path).data)
+
+
+    def node(self, i):
+        try:
+            return self._nodes[i]
+        except KeyError:
+            idx = self._nodes[i] = Node(json.loads(self.data['nodes'][i]))
+            return idx
+
+
+    def __call__(self, words):
+        ''' The candidates for the last of `words` (the arguments after the program name).
+        '''
+        *words, word = words or ['']
+        state, arg = self.walk(words)
+        if state == None: return []
+        if word[:1] == '-' and (state != 'value' or arg[1] == INFINITY):
+            return self.keywords(arg if state == 'command' else arg[0], word)
+        if state == 'command':
+            return [name for name, _ in arg.lookup(word)]
+        param = arg[2] if state == 'value' else arg[1]
+        return [c for c in param['choices'] or [] if c.startswith(word)]
+
+
+    def walk(self, words):
+        ''' Walk the completed `words`.
+
+        Returns the state at the end of them:
+        ``('positional', (idx, param))``, ``('value', (idx, need, param))``, ``('command', idx)`` or ``(None, None)`` if the argv is invalid.
+        '''
+        argv = ArgvCursor(words)
+        idx = self.node(0)
+        while True:
+            # Positional parameters
+            for p in idx.positional:
+                if p['name'].startswith('_'): continue
+                while True:
+                    if not argv: return 'positional', (idx, p)
+                    if argv.grab() == None or not p['repeated']: break
+            # Keyword parameters
+            while argv and argv.kind != VALUE:
+                if argv.kind == TERM:
+                    argv.advance()
+                    break
+                if argv.kind != KEYWORD: return None, None
+                dashes, arg, count = argv.val
+                argv.advance()
+                p = idx.alias.get(arg if dashes==2 else arg[-1], False)
+                if p == False: # An unknown keyword (for **kwargs) takes a value if there is one
+                    argv.grab()
+                    continue
+                if is_flag(p): continue
+                need = 1 if count == False else int(count) if count else INFINITY
+                while need:
+                    if not argv: return 'value', (idx, need, p)
+                    if argv.grab() == None: break
+                    if need != INFINITY: need -= 1
+            # Sub-command
+            if not argv: return 'command', idx
+            found = idx.lookup(argv.head.replace('_','-'))
+            if len(found) != 1: return None, None
+            argv.advance()
+            idx = self.node(idx.sub[found[0][1]])
+
+
+    def keywords(self, idx, word):
+        if '#' in word: return []
+        if word[:2] != '--' and len(word) > 2: # A cluster of short flags
+            if not all(len(a) == 1 and is_flag(idx.alias.get(a, False)) for a in word[1:]): return []
+            return [word + a for a in idx.names if len(a) == 1 and a not in word[1:]]
+        found = [('-' if len(a) == 1 else '--') + a for a in idx.names]
+        return sorted(a for a in found if a.startswith(word))
+
+
+
+BASH = '''_yaclipy_{fn}() {{
+    local IFS=$'\\n'
+    COMPREPLY=( $({cmd} -- "${{COMP_WORDS[@]:1:COMP_CWORD}}") )
+}}
+complete -o default -F _yaclipy_{fn} {prog}
+'''
+
+ZSH = '''_yaclipy_{fn}() {{
+    local -a reply
+    reply=( ${{(f)"$({cmd} -- ${{words[2,CURRENT]}})"}} )
+    if (( ${{#reply}} )); then compadd -a reply; else _files; fi
+}}
+compdef _yaclipy_{fn} {prog}
+'''
+
+FISH = '''function __yaclipy_{fn}
+    {cmd} -- (commandline -opc)[2..-1] (commandline -ct)
+end
+complete -c {prog} -a '(__yaclipy_{fn})'
+'''
+
+
+def script(shell, prog, manifest, root=''):
+    ''' The completion script for `shell` (bash, zsh or fish).
+    '''
+    cmd = ' '.join(shlex.quote(x) for x in [sys.executable, '-m', 'yaclipy.complete', 'query', os.path.abspath(manifest)] + ([root] if root else []))
+    tmpl = {'bash': BASH, 'zsh': ZSH, 'fish': FISH}[shell]
+    return tmpl.format(fn=''.join(c if c.isalnum() else '_' for c in os.path.basename(prog)), prog=shlex.quote(prog), cmd=cmd)
+
+
+
+def main(argv):
+    ''' query <manifest> [<root>] -- <words>...
+        script <bash|zsh|fish> <prog> <manifest> [<root>]
+    '''
+    if argv[:1] == ['query'] and '--' in argv:
+        i = argv.index('--')
+        complete = Completer.load(*argv[1:i])
+        if complete: print('\n'.join(complete(argv[i+1:])))
+    elif argv[:1] == ['script'] and 4 <= len(argv) <= 5:
+        print(script(*argv[1:]), end='')
+    else:
+        print(main.__doc__, file=sys.stderr)
+        return 2
+
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -256,7 +256,7 @@ def set_config(name='', context=None):
     def in_ctx():
         config_contextvar.set(cfg)
         if name: cfg.set_configure(name, 2)
-    context.run(in_ctx) if context else in_ctx()
+    context.run(in_ctx) if context is not None else in_ctx()
     return cfg
 
 
@@ -264,7 +264,7 @@ def copy_config(name='', *, context=None):
     ''' Create a new Config() that is in the given `name`.
     The new Config() is set in a copy of the given `context` and the new context is returned.
     '''
-    ctx = context.copy() if context else contextvars.copy_context()
+    ctx = context.copy() if context is not None else contextvars.copy_context()
     set_config(name, ctx)
     return ctx
 
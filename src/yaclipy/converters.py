@@ -0,0 +1,125 @@
+''' Turn a parameter's annotation (or default value) into a converter for its command line values.
+
+Each parameter is analysed once when its `ArgSpec` is compiled.
+The result is a specialised ``coerce(str)`` function, so binding never has to dispatch on the type again.
+'''
+import sys, enum
+from inspect import Parameter
+
+
+
+def coerce_int(v):
+    if isinstance(v, str) and len(v) > 1 and v[0] == '0':
+        if v[1] in 'xX': return int(v, 16)
+        if v[1] in 'bB': return int(v, 2)
+        if v[1] in '123456789': return int(v, 8)
+    return int(v)
+
+
+
+_registry = []
+
+def register(test):
+    ''' Register a converter factory for the annotations where ``test(annotation)`` is true.
+
+    The factory is called with the annotation, and must return a ``(coerce, name)`` tuple.
+    Converters registered later take precedence.
+    '''
+    def _f(factory):
+        _registry.insert(0, (test, factory))
+        return factory
+    return _f
+
+
+
+def _typing(name):
+    # The typing module is only around if the annotation came from it.
+    return getattr(sys.modules.get('typing'), name, None)
+
+
+def _union_args(ann):
+    origin = getattr(ann, '__origin__', None)
+    if (origin is not None and origin is _typing('Union')) or type(ann).__name__ == 'UnionType':
+        return ann.__args__
+
+
+def _list_arg(ann):
+    origin = getattr(ann, '__origin__', None)
+    if origin is list or (isinstance(origin, type) and origin.__module__ == 'collections.abc' and origin.__name__ in ('Sequence', 'MutableSequence', 'Iterable')):
+        args = getattr(ann, '__args__', None)
+        return str if not args or type(args[0]).__name__ == 'TypeVar' else args[0]
+
+
+
+def converter(ann):
+    ''' Analyse the annotation `ann`.
+
+    Returns ``(coerce, name, repeated)``.
+    ``Optional[T]`` is the same as ``T``, and ``[T]``, ``List[T]`` or ``list[T]`` are repeated ``T`` values.
+    '''
+    args = _union_args(ann)
+    if args:
+        args = [a for a in args if a is not type(None)]
+        if len(args) == 1: return converter(args[0])
+    if isinstance(ann, list):
+        coerce, name, _ = converter(ann[0] if ann else '')
+        return coerce, name, True
+    item = _list_arg(ann)
+    if item != None:
+        coerce, name, _ = converter(item)
+        return coerce, name, True
+    for test, factory in _registry:
+        try:
+            if not test(ann): continue
+        except TypeError:
+            continue
+        return factory(ann) + (False,)
+    if not callable(ann):
+        return converter(type(ann))
+    return ann, getattr(ann, '__name__', repr(ann)), False
+
+
+
+@register(lambda ann: ann is Parameter.empty or ann is type(None) or ann is str)
+def _str(ann):
+    return str, 'str'
+
+
+@register(lambda ann: ann is int)
+def _int(ann):
+    return coerce_int, 'int'
+
+
+@register(lambda ann: ann is dict)
+def _json(ann):
+    import json
+    return json.loads, 'json'
+
+
+@register(lambda ann: _typing('Literal') != None and getattr(ann, '__origin__', None) is _typing('Literal'))
+def _literal(ann):
+    values = ann.__args__
+    name = '|'.join(map(str, values))
+    if all(isinstance(v, str) for v in values):
+        allowed = frozenset(values)
+        def literal(v):
+            if v not in allowed: raise ValueError(v)
+            return v
+    else:
+        lookup = {str(v):v for v in values}
+        def literal(v):
+            return lookup[v]
+    return literal, name
+
+
+@register(lambda ann: isinstance(ann, type) and issubclass(ann, enum.Enum))
+def _enum(ann):
+    lookup = dict(ann.__members__)
+    def member(v):
+        return lookup[v]
+    return member, ann.__name__
+
+
+@register(lambda ann: isinstance(ann, type) and ann.__module__ == 'pathlib')
+def _path(ann):
+    return ann, 'path'
@@ -1,10 +1,8 @@
-from print_ext import Printer
-from docstring_parser import parse as docstring_parse
-
 
 
 class CmdDoc():
     def __init__(self, doc):
+        from docstring_parser import parse as docstring_parse
         self.doc = docstring_parse(doc)
 
 
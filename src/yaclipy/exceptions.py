@@ -1,5 +1,5 @@
 import sys, os, inspect
-from print_ext import pretty, Table, Printer, PrettyException, Bdr
+from print_ext import pretty, Table, Printer, PrettyException, Bdr, StringIO
 
 
 class CmdError(PrettyException):
@@ -57,3 +57,27 @@ class UsageError(PrettyException):
         print(lines[0])
         print('\b2$', os.path.relpath(inspect.getsourcefile(self.fn)), f'\bdem :{lno}')
         print(*self.msg)
+
+
+
+class ArgFileError(PrettyException):
+    def __pretty__(self, print, **kwargs):
+        print(f"Couldn't read arguments from \berr {self.path}\b : {self.error.strerror or self.error}")
+
+
+
+class WorkerError(PrettyException):
+    ''' A `PrettyException` from a worker process that couldn't be sent back as itself.
+    '''
+    def __init__(self, name, text):
+        super().__init__(name=name, text=text)
+
+    @classmethod
+    def of(cls, e):
+        print = Printer.using(StringIO)(ascii=True, color=False)
+        print.pretty(e)
+        return cls(e.__class__.__name__, str(print).rstrip())
+
+    def __pretty__(self, print, **kwargs):
+        print(self.text)
+        print.hr(f'{self.name} (in a worker process)', style='err')
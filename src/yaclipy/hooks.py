@@ -0,0 +1,48 @@
+''' Events that are sent while commands are bound and run, for timing and profiling (see `yaclipy.profile`).
+
+A hook is any object with some of these methods:
+
+* ``on_bind(cmd, run_spec, timings)``: a `Command` was bound.  `timings` has the seconds spent on its
+  ``signature`` (including importing a "module:attr" command), binding its argv (``bind``) and
+  looking up the sub-command (``lookup``).  A command is reported before its sub-command is bound.
+* ``on_call_start(bound, input)``: a `BoundInvocation` is about to be called with the `input` from the previous command.
+* ``on_call_end(bound, seconds, error)``: it has finished, along with the rest of the chain after it.
+  `error` is the exception that it raised, or None.
+* ``on_yield(bound, value)``: a generator yielded a value, which is about to go to the next command.
+* ``on_output(bound, value, seconds)``: a final result was written to the output sink.
+
+When there are no hooks the only cost is checking whether the `HOOKS` list is empty.
+'''
+
+HOOKS = []
+EVENTS = ('on_bind', 'on_call_start', 'on_call_end', 'on_yield', 'on_output')
+
+
+
+def add(hook):
+    HOOKS.append(hook)
+    return hook
+
+
+def remove(hook):
+    HOOKS.remove(hook)
+
+
+
+def emit(event, *args):
+    for hook in list(HOOKS):
+        fn = getattr(hook, event, None)
+        if fn != None: fn(*args)
+
+
+
+def yields(bound, values):
+    for y in values:
+        emit('on_yield', bound, y)
+        yield y
+
+
+async def ayields(bound, values):
+    async for y in values:
+        emit('on_yield', bound, y)
+        yield y
@@ -0,0 +1,271 @@
+''' A manifest is a JSON description of a whole command tree.
+
+It records each command's name, parameters (aliases, kinds, types, defaults) and docstring,
+along with the source files that they came from.
+Each command is stored as its own JSON string, which is only decoded when that command is visited.
+A `Manifest` can then check an argv, show help, or report a missing command without importing any of the commands.
+It is stale as soon as one of its source files changes.
+
+    $ python -m yaclipy.manifest myapp.cli:main -o myapp.manifest
+'''
+import os, sys, enum, json, inspect
+from inspect import Parameter
+from .command import Command, SubCommands
+from .arg_spec import ArgSpec, func_name
+from .converters import _union_args, _list_arg, _typing
+from .sources import stamps, changed, MANIFEST_VERSION as VERSION
+
+
+
+def _ref(fn):
+    ''' The "module:qualname" of `fn`, if it can be imported again.
+    '''
+    module, qualname = getattr(fn, '__module__', None), func_name(fn, '__qualname__')
+    if not module or not isinstance(qualname, str) or '<' in qualname: return None
+    return f"{module}:{qualname}"
+
+
+
+def _choices(ann):
+    ''' The allowed values of a Literal or Enum annotation.
+    '''
+    args = _union_args(ann)
+    if args:
+        args = [a for a in args if a is not type(None)]
+        if len(args) == 1: ann = args[0]
+    if isinstance(ann, list):
+        ann = ann[0] if ann else ''
+    elif _list_arg(ann) != None:
+        ann = _list_arg(ann)
+    origin = getattr(ann, '__origin__', None)
+    if origin is not None and origin is _typing('Literal'):
+        return [str(v) for v in ann.__args__]
+    if isinstance(ann, type) and issubclass(ann, enum.Enum):
+        return list(ann.__members__)
+
+
+
+def _default(val):
+    try:
+        return json.loads(json.dumps(val))
+    except (TypeError, ValueError):
+        return repr(val)
+
+
+
+def describe(cmd, nodes, sources, _ancestors=None):
+    ''' Describe the command `cmd` and all of its sub-commands as manifest nodes.
+
+    The nodes are appended to `nodes`, and the number of `cmd`'s node is returned.
+    A node's sub-commands refer to the numbers of their nodes.
+    A command that is already one of its own ancestors refers back to that ancestor's node.
+    The source file of every function is added to `sources`.
+    '''
+    fn = cmd.fn
+    key = getattr(fn, '__func__', fn)
+    if _ancestors == None: _ancestors = {}
+    if key in _ancestors: return _ancestors[key]
+    try:
+        sources.add(os.path.abspath(inspect.getsourcefile(fn)))
+    except TypeError:
+        pass
+    spec = cmd.argspec
+    params = []
+    for name, p in spec.sig.parameters.items():
+        param = {'name': name, 'kind': p.kind.name, 'required': p.default is Parameter.empty}
+        if name in spec.params:
+            t = spec.params[name].type
+            param.update(aliases=sorted(spec.params[name].aliases), type=t.name, repeated=t.repeated, choices=_choices(p.default if p.annotation is Parameter.empty else p.annotation))
+            if not param['required']: param['default'] = _default(p.default)
+        params.append(param)
+    node = {'name': cmd.real_name, 'ref': cmd.ref or _ref(fn), 'doc': inspect.getdoc(fn) or '', 'params': params, 'sub': {}}
+    nodes.append(node)
+    ancestors = dict(_ancestors)
+    ancestors[key] = len(nodes)-1
+    for real_name, sub in cmd.sub_cmds().items():
+        node['sub'][real_name] = describe(sub, nodes, sources, ancestors)
+    return ancestors[key]
+
+
+
+_types = {'str': str, 'int': int, 'float': float, 'bool': bool, 'json': dict, 'complex': complex}
+
+def _annotation(param):
+    ''' An annotation that coerces values like the original one did, as far as the manifest knows.
+    '''
+    if param['choices'] != None:
+        allowed = frozenset(param['choices'])
+        def ann(v):
+            if v not in allowed: raise ValueError(v)
+            return v
+    elif param['type'] in _types:
+        ann = _types[param['type']]
+    else:
+        def ann(v): # Can't check this type without importing it
+            return v
+    if ann not in _types.values(): ann.__name__ = param['type']
+    return [ann] if param['repeated'] else ann
+
+
+
+def _stub(node):
+    ''' A function with the same signature as the one described by `node`.
+    '''
+    params = []
+    for p in node['params']:
+        kind = getattr(Parameter, p['kind'])
+        if kind in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD):
+            params.append(Parameter(p['name'], kind))
+        else:
+            params.append(Parameter(p['name'], kind, default=Parameter.empty if p['required'] else p.get('default'), annotation=_annotation(p)))
+    def stub(*args, **kwargs): pass
+    stub.__signature__ = inspect.Signature(params)
+    stub.__name__ = stub.__qualname__ = node['name']
+    return stub
+
+
+
+class ManifestCommand(Command):
+    ''' A `Command` that is described by a manifest node instead of an imported function.
+
+    Binding an argv checks it, shows help and finds sub-commands exactly like the real command would.
+    Types that the manifest doesn't know about are only checked when the real command is bound.
+    '''
+    def __init__(self, manifest, i=0, name=None):
+        node = manifest.node(i)
+        super().__init__(node['ref'] or '', name or node['name'])
+        self.manifest = manifest
+        self.node = node
+
+
+    @property
+    def argspec(self):
+        if not hasattr(self, '_argspec'):
+            self._argspec = ArgSpec(_stub(self.node))
+        return self._argspec
+
+
+    def doc(self, check=False):
+        if not hasattr(self, '_doc'):
+            from .docs import CmdDoc
+            self._doc = CmdDoc(self.node['doc'])
+        return self._doc
+
+
+    def sub_cmds(self):
+        if not hasattr(self, '_sub_cmds'):
+            subs = self.node['sub']
+            self._sub_cmds = SubCommands(subs, lambda name: ManifestCommand(self.manifest, subs[name], name))
+        return self._sub_cmds
+
+
+
+class Manifest():
+    ''' The manifest of a command tree.
+
+    Use `Manifest.cached` to load it from a file, rebuilding the file when it is stale.
+    '''
+    def __init__(self, data):
+        self.data = data
+        self._nodes = {}
+
+
+    @classmethod
+    def build(cls, cmd):
+        ''' Import and describe the whole command tree of `cmd` (a Command, function or "module:attr").
+        '''
+        if not isinstance(cmd, Command): cmd = Command(cmd)
+        nodes, sources = [], set()
+        describe(cmd, nodes, sources)
+        nodes = [json.dumps(node, separators=(',', ':')) for node in nodes]
+        return cls({'version': VERSION, 'sources': stamps(sources), 'nodes': nodes})
+
+
+    @classmethod
+    def load(cls, path):
+        ''' Load the manifest at `path`.  Returns None if it is missing, unreadable or stale.
+        '''
+        try:
+            with open(path) as f:
+                manifest = cls(json.load(f))
+        except (OSError, ValueError):
+            return None
+        if manifest.data.get('version') != VERSION or manifest.is_stale(): return None
+        return manifest
+
+
+    @classmethod
+    def cached(cls, cmd, path):
+        ''' Load the manifest at `path`, or build it from `cmd` and save it if it is stale.
+        '''
+        manifest = cls.load(path)
+        if manifest == None:
+            manifest = cls.build(cmd)
+            try:
+                manifest.save(path)
+            except OSError:
+                pass
+        return manifest
+
+
+    def save(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.data, f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+
+    def is_stale(self):
+        ''' Has any of the source files changed?
+        '''
+        return changed(self.data['sources'])
+
+
+    def node(self, i):
+        ''' The `i`th node (the root is 0).
+        '''
+        try:
+            return self._nodes[i]
+        except KeyError:
+            node = self._nodes[i] = json.loads(self.data['nodes'][i])
+            return node
+
+
+    def command(self):
+        ''' The root `ManifestCommand`.
+        '''
+        return ManifestCommand(self)
+
+
+    def check(self, argv):
+        ''' Bind `argv` against the manifest.
+
+        Raises the same `CmdError` that the real command would for help, unknown commands and argument errors.
+        '''
+        return self.command()(list(argv))
+
+
+
+def write(root, *, out__o=''):
+    ''' Write the manifest of a command tree.
+
+    Parameters:
+        <module:function>
+            The root command
+        --out <path>, -o <path>
+            The file to write.  The manifest is printed if this isn't given.
+    '''
+    manifest = Manifest.build(root)
+    if out__o:
+        manifest.save(out__o)
+    else:
+        json.dump(manifest.data, sys.stdout, indent=1)
+
+
+
+if __name__ == '__main__':
+    from print_ext import Printer, PrettyException
+    try:
+        Command(write)(sys.argv[1:]).run()
+    except PrettyException as e:
+        Printer().pretty(e)
@@ -0,0 +1,267 @@
+''' Sinks for the final results of a command chain.
+
+The default ``pretty`` sink shows each result with print_ext.
+The others write one line per result, through a large buffer that is flushed every `FLUSH` seconds,
+so that millions of small records don't go through the layout engine:
+
+* ``jsonl``: one JSON value per line
+* ``csv`` and ``tsv``: a header from the keys of the first dict, then one row per result
+* ``raw``: ``str(result)``
+* ``auto``: ``pretty`` for a terminal and ``jsonl`` for anything else
+* ``full``: ``pretty``, without summarizing large values
+
+The ``pretty`` sink summarizes large values (see `Summary`) so that the first line is shown quickly, however big the result is.
+'''
+import sys, io, time, itertools
+from array import array
+from collections import deque
+from collections.abc import Sequence, Set
+
+BUFFER = 1 << 20
+FLUSH = 0.5 # Seconds
+LARGE = 1000 # Containers with more items than this are summarized by the pretty sink
+LARGE_TEXT = 1 << 16 # ... and strings with more characters than this
+EDGE = 10 # The number of items shown from each end of a summarized container
+
+
+
+class Sink():
+    ''' Writes results to `stream` (default: stdout) through a buffer.
+    '''
+    def __init__(self, stream=None):
+        self.stream = sys.stdout if stream == None else stream
+        self.out = self._buffered(self.stream)
+        self.flushed = time.monotonic()
+
+
+    @staticmethod
+    def _buffered(stream, **kwargs):
+        try:
+            fd = stream.fileno()
+        except (AttributeError, OSError, ValueError): # A StringIO, or a test's captured stdout
+            return stream
+        stream.flush()
+        return io.open(fd, 'w', buffering=BUFFER, encoding=getattr(stream, 'encoding', None), closefd=False, **kwargs)
+
+
+    def write(self, val):
+        self.out.write(self.format(val))
+        now = time.monotonic()
+        if now - self.flushed > FLUSH:
+            self.out.flush()
+            self.flushed = now
+
+
+    def format(self, val):
+        return f"{val}\n"
+
+
+    def flush(self):
+        self.out.flush()
+
+
+
+class Raw(Sink):
+    pass
+
+
+
+class JsonLines(Sink):
+    def __init__(self, stream=None):
+        import json
+        super().__init__(stream)
+        self.dumps = json.JSONEncoder(default=str, ensure_ascii=False, separators=(',', ':')).encode
+
+
+    def format(self, val):
+        return self.dumps(val) + '\n'
+
+
+
+class Delimited(Sink):
+    ''' CSV (or TSV with a tab `delimiter`).
+
+    The header is the keys of the first result, if it's a dict.  Later dicts are written in the same columns.
+    A list or tuple is one row, and anything else is a single column.
+    '''
+    def __init__(self, stream=None, delimiter=','):
+        import csv
+        super().__init__(stream)
+        self.writer = csv.writer(self.out, delimiter=delimiter, lineterminator='\n')
+        self.keys = None
+
+
+    def _buffered(self, stream):
+        return Sink._buffered(stream, newline='')
+
+
+    def write(self, val):
+        if isinstance(val, dict):
+            if self.keys == None:
+                self.keys = list(val)
+                self.writer.writerow(self.keys)
+            row = [val.get(k, '') for k in self.keys]
+        elif isinstance(val, (list, tuple)):
+            row = val
+        else:
+            row = [val]
+        self.writer.writerow(row)
+        now = time.monotonic()
+        if now - self.flushed > FLUSH:
+            self.out.flush()
+            self.flushed = now
+
+
+
+class Summary():
+    ''' Shows the length, item types, size and the first and last `edge` items of a large container.
+
+    An iterator is only advanced `edge` + 1 times.  Its length and last items are unknown.
+    Only the shown items are looked at, so a summary takes the same time however large `val` is.
+    If `item` is given then the shown items are replaced by ``item(x)``.
+    '''
+    def __init__(self, val, edge=EDGE, item=None):
+        self.kind = type(val).__name__
+        self.unit = 'items'
+        self.tail = {}
+        self.more = True
+        if isinstance(val, (str, bytes, bytearray)):
+            self.size, self.nbytes, self.types = len(val), None, None
+            self.unit = 'characters' if isinstance(val, str) else 'bytes'
+            self.head, self.tail = val[:edge*100], val[-edge*100:]
+            return
+        if hasattr(val, '__next__'): # An iterator
+            head = list(itertools.islice(val, edge + 1))
+            self.more = len(head) > edge
+            self.size, self.nbytes = None, None
+            self.head = dict(enumerate(head[:edge]))
+        else:
+            self.size = len(val)
+            self.nbytes = len(val) * val.itemsize if isinstance(val, array) else getattr(val, 'nbytes', None)
+            if isinstance(val, dict):
+                self.head = dict(itertools.islice(val.items(), edge))
+                try:
+                    self.tail = dict(reversed(list(itertools.islice(reversed(val.items()), edge))))
+                except TypeError: # Python < 3.8
+                    pass
+            elif isinstance(val, memoryview) and val.ndim != 1: # Its items can't be indexed
+                self.head = {}
+            elif hasattr(val, '__getitem__'):
+                self.head = {i: val[i] for i in range(min(edge, self.size))}
+                self.tail = {i: val[i] for i in range(max(edge, self.size - edge), self.size)}
+            else: # A set
+                self.head = dict(enumerate(itertools.islice(val, edge)))
+        shown = list(self.head.values()) + list(self.tail.values())
+        self.types = sorted(set(type(x).__name__ for x in shown))
+        if item != None:
+            self.head = {k: item(v) for k, v in self.head.items()}
+            self.tail = {k: item(v) for k, v in self.tail.items()}
+
+
+    def __pretty__(self, print, **kwargs):
+        about = [f'{self.size:,} {self.unit}' if self.size != None else 'lazy']
+        if self.types: about.append(('of type ' if len(self.types) == 1 else 'of types ') + ', '.join(self.types))
+        if self.nbytes != None: about.append(f'{self.nbytes:,} bytes')
+        print(f"\b2 {self.kind}\b  ({'; '.join(about)})")
+        if self.head: print.pretty(self.head)
+        if self.more: print('...')
+        if self.tail: print.pretty(self.tail)
+
+
+
+def _sized(val):
+    # The common types first, as the ABCs are slower to check
+    return isinstance(val, (list, tuple, dict, set, frozenset, range, array, memoryview, deque)) or hasattr(val, 'nbytes') or isinstance(val, (Sequence, Set))
+
+
+def _opaque(val):
+    # Containers whose items aren't looked into
+    return isinstance(val, (set, frozenset, range, array, memoryview, Set)) or hasattr(val, 'nbytes')
+
+
+def _count(val, limit, depth):
+    ''' The number of items in `val` and the lists, tuples and dicts in it (`depth` levels deep), counting no further than `limit`.
+    '''
+    n = len(val)
+    if n > limit or not depth or _opaque(val): return n
+    for v in val.values() if isinstance(val, dict) else val:
+        if _sized(v):
+            try:
+                n += _count(v, limit - n, depth-1)
+            except TypeError:
+                pass
+            if n > limit: break
+    return n
+
+
+def _summary(val, large, edge, depth):
+    # Each shown item gets an even share of `large`
+    shown = min(edge, large // 2)
+    share = large // (2*shown) if shown else 0
+    return Summary(val, shown, lambda v: bounded(v, share, edge, depth-1))
+
+
+def bounded(val, large=LARGE, edge=EDGE, _depth=3):
+    ''' `val` with the parts that are too large to show replaced by a `Summary`, so that about `large` items are shown at most.
+
+    A container of more than `large` items (or an iterator) is summarized.
+    A smaller sequence, set or dict is kept, unless it has more than `large` items in total (counting the containers in it,
+    a few levels deep).  Then its items share what is left of `large`, or it is summarized if their shares would be too small to show much.
+    '''
+    if isinstance(val, (str, bytes, bytearray)):
+        return Summary(val, edge) if len(val) > LARGE_TEXT else val
+    if hasattr(val, '__next__'): return _summary(val, large, edge, _depth)
+    if not _sized(val): return val
+    try:
+        if len(val) > large: return _summary(val, large, edge, _depth)
+        total = _count(val, large, _depth)
+    except TypeError:
+        return val
+    if _depth <= 0 or _opaque(val): return val
+    share = large if total <= large else (large - len(val)) // len(val)
+    if share < 2*edge: return _summary(val, large, edge, _depth)
+    if isinstance(val, dict):
+        items = {k: bounded(v, share, edge, _depth-1) for k, v in val.items()}
+        return items if any(items[k] is not v for k, v in val.items()) else val
+    items = [bounded(v, share, edge, _depth-1) for v in val]
+    return items if any(a is not b for a, b in zip(items, val)) else val
+
+
+
+class Pretty():
+    ''' Shows each result with the print_ext `Printer`, which is only looked up once.
+
+    Containers with more than `large` items are summarized unless `full` is set.
+    '''
+    def __init__(self, stream=None, full=False, large=LARGE):
+        from print_ext import Printer
+        self.printer = Printer()
+        if stream != None: self.printer = self.printer.__class__(stream=stream)
+        self.full = full
+        self.large = large
+
+
+    def write(self, val):
+        self.printer.pretty(val if self.full else bounded(val, self.large))
+
+
+    def flush(self):
+        pass
+
+
+
+SINKS = {'pretty': Pretty, 'full': lambda stream=None: Pretty(stream, full=True), 'jsonl': JsonLines, 'csv': Delimited, 'tsv': lambda stream=None: Delimited(stream, '\t'), 'raw': Raw}
+
+
+def sink(output=None, stream=None):
+    ''' The sink for `output`: one of the `SINKS` names, ``'auto'`` or a sink (returned as is).  The default is ``pretty``.
+    '''
+    if output == None: output = 'pretty'
+    if not isinstance(output, str): return output
+    if output == 'auto':
+        isatty = getattr(sys.stdout if stream == None else stream, 'isatty', None)
+        output = 'pretty' if isatty and isatty() else 'jsonl'
+    try:
+        return SINKS[output](stream)
+    except KeyError:
+        raise ValueError(f"Unknown output: {output!r}.  Use one of: auto, {', '.join(SINKS)}") from None
@@ -0,0 +1,210 @@
+''' Where the time goes when a command chain is bound and run.
+
+`Profile` is a hook (see `yaclipy.hooks`) that records, for each command in the chain:
+the time spent on its signature, binding its argv and looking up its sub-command,
+the number of calls, the total time of its calls (with the rest of the chain after it),
+its own share of that, the values it yielded and the time spent writing its results.
+
+It can also write the cProfile data of each command to its own pstats file,
+and a collapsed-stack file (one "root;sub;leaf microseconds" line per stage) for flamegraph tools.
+
+    $ python -m yaclipy.profile --pstats prof/ --collapsed stacks.txt myapp.cli:main build --fast
+'''
+import os, sys
+from . import hooks
+
+
+
+class Stage():
+    ''' The timings of one command in the chain, over every chain with the same `path` of command names.
+    '''
+    __slots__ = ('path', 'cmds', 'calls', 'seconds', 'yields', 'output', 'profiler')
+
+    def __init__(self, path):
+        self.path = path
+        self.cmds = set()
+        self.calls = 0
+        self.seconds = 0.0
+        self.yields = 0
+        self.output = 0.0
+        self.profiler = None
+
+
+
+class Profile():
+    ''' A hook that times each command of every chain that is bound and run while it is added.
+
+    Use it as a context manager, which adds and removes the hook:
+
+        with Profile() as prof:
+            cmd(argv).run()
+        Printer().pretty(prof)
+
+    If `pstats` is a directory then each command is also profiled with cProfile, and its stats are written there by `close`.
+    If `collapsed` is a path then the collapsed stacks are written to it by `close`.
+    '''
+    def __init__(self, pstats='', collapsed=''):
+        self.pstats = pstats
+        self.collapsed = collapsed
+        self.binds = {} # cmd -> [count, signature, bind, lookup]
+        self.paths = {} # path -> Stage
+        self.stages = {} # bound -> Stage, for the chains that are running
+        self.active = [] # The enabled cProfile.Profile is the last one
+
+
+    def __enter__(self):
+        hooks.add(self)
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+    def close(self):
+        ''' Remove the hook and write the pstats and collapsed-stack files.
+        '''
+        if self in hooks.HOOKS: hooks.remove(self)
+        for prof in reversed(self.active): prof.disable()
+        self.active.clear()
+        if self.pstats:
+            os.makedirs(self.pstats, exist_ok=True)
+            for stage in self.paths.values():
+                if stage.profiler: stage.profiler.dump_stats(os.path.join(self.pstats, '.'.join(stage.path) + '.pstats'))
+        if self.collapsed:
+            with open(self.collapsed, 'w') as f:
+                for stack, seconds in self.stacks():
+                    f.write(f"{';'.join(stack)} {round(seconds * 1e6)}\n")
+
+
+    def stage(self, bound):
+        if bound not in self.stages: # The start of a chain
+            path, link = (), bound
+            while link != None:
+                path += (link.cmd.name,)
+                if path not in self.paths: self.paths[path] = Stage(path)
+                self.paths[path].cmds.add(link.cmd)
+                self.stages[link] = self.paths[path]
+                link = link.next_cmd
+        return self.stages[bound]
+
+
+    def on_bind(self, cmd, run_spec, timings):
+        rec = self.binds.setdefault(cmd, [0, 0.0, 0.0, 0.0])
+        rec[0] += 1
+        rec[1] += timings['signature']
+        rec[2] += timings['bind']
+        rec[3] += timings['lookup']
+
+
+    def on_call_start(self, bound, input):
+        stage = self.stage(bound)
+        if self.pstats:
+            import cProfile
+            if stage.profiler == None: stage.profiler = cProfile.Profile()
+            if self.active: self.active[-1].disable()
+            stage.profiler.enable()
+            self.active.append(stage.profiler)
+
+
+    def on_call_end(self, bound, seconds, error):
+        stage = self.stage(bound)
+        stage.calls += 1
+        stage.seconds += seconds
+        if stage.profiler:
+            stage.profiler.disable()
+            # Calls of concurrent jobs don't always end in the order that they started
+            for i in range(len(self.active)-1, -1, -1):
+                if self.active[i] is stage.profiler:
+                    del self.active[i]
+                    break
+            if self.active: self.active[-1].enable()
+        if len(stage.path) == 1: # The chain is done, so forget its links
+            while bound != None:
+                self.stages.pop(bound, None)
+                bound = bound.next_cmd
+
+
+    def on_yield(self, bound, value):
+        self.stage(bound).yields += 1
+
+
+    def on_output(self, bound, value, seconds):
+        self.stage(bound).output += seconds
+
+
+    def rows(self):
+        ''' The timings of each stage as a dict, in chain order (depth first).
+
+        ``self`` is the time of a stage's calls without the stages after it or writing output.
+        With concurrent jobs the calls of the later stages overlap, so ``self`` is only a lower bound.
+        '''
+        rows = []
+        for path, stage in sorted(self.paths.items()):
+            after = sum(s.seconds for p, s in self.paths.items() if p[:-1] == path)
+            binds, signature, bind, lookup = [sum(x) for x in zip([0, 0.0, 0.0, 0.0], *(self.binds[c] for c in stage.cmds if c in self.binds))]
+            rows.append({
+                'path': path, 'binds': binds, 'signature': signature, 'bind': bind, 'lookup': lookup,
+                'calls': stage.calls, 'total': stage.seconds, 'self': max(0.0, stage.seconds - after - stage.output),
+                'yields': stage.yields, 'output': stage.output,
+            })
+        return rows
+
+
+    def stacks(self):
+        ''' The (stack, seconds) of each stage, its binding and its output, for a flamegraph.
+        '''
+        for row in self.rows():
+            stack = list(row['path'])
+            bind = row['signature'] + row['bind'] + row['lookup']
+            if bind: yield stack + ['<bind>'], bind
+            if row['self']: yield stack, row['self']
+            if row['output']: yield stack + ['<output>'], row['output']
+
+
+    def __pretty__(self, print, **kwargs):
+        from print_ext import Table
+        tbl = Table(0,0,0,0,0,0,0,0,0, tmpl='pad')
+        tbl.cell('all', just='>')
+        tbl.cell('C0', style='1', just='<')
+        tbl.cell('R0', style='w!', just='^')
+        tbl('Command\tSignature\tBind\tLookup\tCalls\tTotal\tSelf\tYields\tOutput\t')
+        ms = lambda seconds: f'{seconds*1000:.3f}ms'
+        for row in self.rows():
+            tbl('  ' * (len(row['path'])-1) + row['path'][-1], '\t')
+            tbl(ms(row['signature']), '\t', ms(row['bind']), '\t', ms(row['lookup']), '\t')
+            tbl(row['calls'], '\t', ms(row['total']), '\t', ms(row['self']), '\t', row['yields'], '\t', ms(row['output']), '\t')
+        print(tbl)
+
+
+
+def main(argv):
+    ''' [--pstats <dir>] [--collapsed <path>] <module:function> <argv>...
+
+    Bind and run a command line with a `Profile`, and print its timing table to stderr.
+        --pstats <dir>       Write the cProfile stats of each command to <dir>/<root>.<sub>.pstats
+        --collapsed <path>   Write the collapsed stacks of the commands to <path>, for flamegraph tools
+    '''
+    from print_ext import Printer, PrettyException
+    from .command import Command
+    options = {}
+    while argv[:1] in (['--pstats'], ['--collapsed']) and len(argv) > 1:
+        options[argv[0][2:]] = argv[1]
+        argv = argv[2:]
+    if not argv or argv[0].startswith('-'):
+        print(main.__doc__, file=sys.stderr)
+        return 2
+    status = 0
+    with Profile(**options) as prof:
+        try:
+            Command(argv[0])(argv[1:]).run()
+        except PrettyException as e:
+            Printer().pretty(e)
+            status = 1
+    Printer(stream=sys.stderr).pretty(prof)
+    return status
+
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
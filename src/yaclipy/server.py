@@ -0,0 +1,286 @@
+''' Serve invocations of a command tree from a warm process over a Unix domain socket.
+
+The server imports the whole command tree once.
+A client (see `forward`) sends its argv, cwd, environment and stdio file descriptors,
+and the server runs the command with them, in its own copy of the config context.
+Invocations are served one at a time, because the cwd, environment and stdio are process-wide.
+
+With `fork` the server binds each argv and then forks a child to run it, so commands that change global state
+always start from the same pristine server, and invocations run concurrently.
+
+When a source file of the command tree changes the client is told to run the command itself,
+and the server re-executes itself to pick up the changes.
+
+Only the user that runs the server can connect to it: the socket is only accessible by its owner,
+and (where the OS reports it) a client with another uid is turned away.
+
+    $ python -m yaclipy.server myapp.cli:main /tmp/myapp.sock &
+    $ python -m yaclipy.server myapp.cli:main /tmp/myapp.sock --fork &
+'''
+import os, sys, stat, json, socket, struct
+from array import array
+
+HEADER = struct.Struct('!I')
+STDIO = (0, 1, 2)
+
+
+
+def _send_fds(sock, fds):
+    sock.sendmsg([b'Y'], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array('i', fds))])
+
+
+def _recv_fds(sock, n):
+    fds = array('i')
+    msg, ancdata, flags, addr = sock.recvmsg(1, socket.CMSG_LEN(n * fds.itemsize))
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(data[:len(data) - (len(data) % fds.itemsize)])
+    return list(fds)
+
+
+def _send(sock, obj):
+    data = json.dumps(obj).encode()
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def _read(sock, n):
+    buf = b''
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk: raise ConnectionError('Connection closed')
+        buf += chunk
+    return buf
+
+
+def _recv(sock):
+    return json.loads(_read(sock, HEADER.unpack(_read(sock, HEADER.size))[0]))
+
+
+
+def forward(path, argv=None, *, stdio=STDIO):
+    ''' Run `argv` (default: ``sys.argv[1:]``) on the server listening at `path`.
+
+    Returns the exit status, or None if there is no server, it is stale, or it couldn't set up the invocation
+    (for example because the cwd doesn't exist).  In that case the caller should run the command itself.
+    '''
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(path)
+        except OSError:
+            return None
+        try:
+            _send_fds(sock, [f if isinstance(f, int) else f.fileno() for f in stdio])
+            _send(sock, {'argv': sys.argv[1:] if argv == None else list(argv), 'cwd': os.getcwd(), 'env': dict(os.environ), 'prog': sys.argv[0]})
+            reply = _recv(sock)
+        except ConnectionError: # Such as a server that turned us away
+            return None
+        return reply.get('status') # No status if it is stale or failed
+    finally:
+        sock.close()
+
+
+
+class Server():
+    ''' A warm process that serves invocations of the command `root`.
+
+    If `fork` is set then each invocation is run in a forked child.
+    '''
+    def __init__(self, root, path, fork=False):
+        from .command import Command
+        self.cmd = root if isinstance(root, Command) else Command(root)
+        self.path = path
+        self.fork = fork
+        self.children = set()
+        self.sources = self.warm()
+
+
+    def warm(self):
+        ''' Import the whole command tree, and stamp the source files that were imported for it.
+        '''
+        from .manifest import describe
+        from .sources import stamps
+        # Everything that running a command (or showing an error) might need
+        import asyncio, print_ext, docstring_parser
+        from . import exceptions, docs, config
+        before = set(sys.modules)
+        paths = set()
+        describe(self.cmd, [], paths)
+        for name in set(sys.modules) - before:
+            path = getattr(sys.modules.get(name), '__file__', None)
+            if path and path.endswith('.py'): paths.add(os.path.abspath(path))
+        return stamps(paths)
+
+
+    def serve_forever(self):
+        ''' Serve until the command tree is stale, then re-execute the server.
+
+        This blocks, so it must not be called from a running event loop (or from a command that is being run).
+        Anything other than a socket at the path is an error, rather than being replaced.
+        '''
+        self.unlink()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            umask = os.umask(0o177) # Only the owner can connect
+            try:
+                sock.bind(self.path)
+            finally:
+                os.umask(umask)
+            sock.listen(64)
+            while True:
+                conn, _ = sock.accept()
+                with conn:
+                    if not self.trusted(conn): continue
+                    if not self.handle(conn): break
+                self.reap()
+        finally:
+            sock.close()
+            self.unlink()
+            self.reap(wait=True)
+        # orig_argv is Python 3.10+.  Before that the server is assumed to be run with ``python -m yaclipy.server``.
+        argv = sys.orig_argv[1:] if getattr(sys, 'orig_argv', None) else ['-m', 'yaclipy.server'] + sys.argv[1:]
+        os.execv(sys.executable, [sys.executable] + argv)
+
+
+    def unlink(self):
+        try:
+            if not stat.S_ISSOCK(os.stat(self.path).st_mode): raise FileExistsError(f"Not a socket: {self.path}")
+        except FileNotFoundError:
+            return
+        os.unlink(self.path)
+
+
+    def trusted(self, conn):
+        ''' Is the client run by the same user as the server?  Always True where the OS doesn't say.
+        '''
+        if not hasattr(socket, 'SO_PEERCRED'): return True # Not Linux.  The socket's permissions still apply.
+        creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+        pid, uid, gid = struct.unpack('3i', creds)
+        return uid == os.getuid()
+
+
+    def handle(self, conn):
+        ''' Serve one invocation.  Returns False if the server is stale.
+        '''
+        from .sources import changed
+        fds = _recv_fds(conn, len(STDIO))
+        try:
+            req = _recv(conn)
+            if changed(self.sources):
+                _send(conn, {'stale': True})
+                return False
+            if self.fork:
+                self.spawn(conn, req, fds)
+            else:
+                _send(conn, {'status': self.invoke(req, fds)})
+        except ConnectionError:
+            pass
+        except Exception as e: # Such as a cwd that doesn't exist.  The server carries on and the client runs the command itself.
+            try:
+                _send(conn, {'error': f"{type(e).__name__}: {e}"})
+            except OSError:
+                pass
+        finally:
+            for fd in fds: os.close(fd)
+        return True
+
+
+    def spawn(self, conn, req, fds):
+        ''' Bind the argv, and then fork a child to run it and reply to the client.
+        '''
+        try:
+            bound = self.cmd(req['argv'])
+        except Exception as e: # Shown by the child, on the client's stdio
+            bound = e
+        pid = os.fork()
+        if pid:
+            self.children.add(pid)
+            return
+        status = 1
+        try:
+            status = self.invoke(req, fds, bound)
+            _send(conn, {'status': status})
+        finally:
+            os._exit(status)
+
+
+    def reap(self, wait=False):
+        for pid in list(self.children):
+            if os.waitpid(pid, 0 if wait else os.WNOHANG)[0]: self.children.discard(pid)
+
+
+    def invoke(self, req, fds, bound=None):
+        ''' Run the request with the client's stdio, cwd, environment and argv.
+        '''
+        from .config import copy_config
+        saved = [os.dup(fd) for fd in STDIO]
+        stdin, argv, cwd, env = sys.stdin, sys.argv, os.getcwd(), dict(os.environ)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            for fd, std in zip(fds, STDIO): os.dup2(fd, std)
+            sys.stdin = open(0, closefd=False) # Nothing buffered from the last client
+            sys.argv = [req['prog']] + req['argv']
+            os.chdir(req['cwd'])
+            os.environ.clear()
+            os.environ.update(req['env'])
+            return copy_config().run(self.run, req['argv'], bound)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            for fd, std in zip(saved, STDIO):
+                os.dup2(fd, std)
+                os.close(fd)
+            if sys.stdin is not stdin: sys.stdin.close()
+            sys.stdin, sys.argv = stdin, argv
+            os.chdir(cwd)
+            os.environ.clear()
+            os.environ.update(env)
+
+
+    def run(self, argv, bound=None):
+        ''' Run the command (unless it was `bound` already) and return the exit status.
+        '''
+        from print_ext import Printer, PrettyException
+        try:
+            if isinstance(bound, Exception): raise bound
+            (self.cmd(argv) if bound == None else bound).run()
+            return 0
+        except PrettyException as e:
+            Printer().pretty(e)
+            return 1
+        except SystemExit as e:
+            if e.code == None or isinstance(e.code, int): return e.code or 0
+            print(e.code, file=sys.stderr)
+            return 1
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            return 1
+
+
+
+def serve(root, path, *, fork__f=False):
+    ''' Serve invocations of a command tree over a Unix domain socket.
+
+    Parameters:
+        <module:function>
+            The root command
+        <path>
+            The socket to listen on
+        --fork, -f
+            Run each invocation in a forked child
+    '''
+    Server(root, path, fork=fork__f).serve_forever()
+
+
+
+if __name__ == '__main__':
+    from print_ext import Printer, PrettyException
+    from .command import Command
+    try:
+        cmd = Command(serve)(sys.argv[1:])
+    except PrettyException as e:
+        Printer().pretty(e)
+        sys.exit(1)
+    serve(*cmd.run_spec.args, **cmd.run_spec.kwargs) # Not from Command.run(), which would run the server in an event loop
@@ -0,0 +1,36 @@
+''' Stamps for the source files that a cache was built from.
+'''
+import os, hashlib
+
+MANIFEST_VERSION = 2 # The format of yaclipy.manifest files, which are read by yaclipy.complete
+
+
+
+def stamp(path):
+    ''' The mtime, size and sha1 of the file at `path`.
+    '''
+    st = os.stat(path)
+    with open(path, 'rb') as f:
+        sha1 = hashlib.sha1(f.read()).hexdigest()
+    return {'mtime': st.st_mtime_ns, 'size': st.st_size, 'sha1': sha1}
+
+
+
+def stamps(paths):
+    return {path: stamp(path) for path in sorted(paths)}
+
+
+
+def changed(stamps):
+    ''' Has any of the stamped files changed (or gone missing)?
+
+    The mtime and size are checked first.  The contents are only hashed if they differ.
+    '''
+    for path, s in stamps.items():
+        try:
+            st = os.stat(path)
+            if st.st_mtime_ns == s['mtime'] and st.st_size == s['size']: continue
+            if stamp(path)['sha1'] != s['sha1']: return True
+        except OSError:
+            return True
+    return False
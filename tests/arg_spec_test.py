@@ -1,6 +1,7 @@
-import pytest
+import pytest, gc
 from print_ext import Printer
-from yaclipy.arg_spec import ArgSpec, ArgType
+from yaclipy import Command
+from yaclipy.arg_spec import ArgSpec, ArgType, spec_of, spec_cache_info
 from yaclipy.exceptions import UsageError
 
 
@@ -48,3 +49,42 @@ def test_type_mismatch():
     estr = [e[1] for e in s.errors if e[0] == 'NO_VALUE'][0]
     assert('2nd' in str(estr))
 
+
+
+def test_spec_is_reusable():
+    def f(a:[int], *, b=False, **kwargs): pass
+    spec = ArgSpec(f)
+    s1 = spec(['1','2','-bb','--x','y'])
+    s2 = spec(['3','--z'])
+    assert(s1.args == [[1,2]] and s1.kwargs == {'b':2, 'x':'y'})
+    assert(s2.args == [[3]] and s2.kwargs == {'z':True})
+    assert(set(spec.params) == {'a','b',''})
+    assert('z' not in spec.alias and 'x' not in spec.alias)
+
+
+
+def test_spec_cache():
+    class Jim():
+        def g(self, x=1): return x
+        def h(self) -> str: pass
+    def f() -> Jim: pass
+    spec_of(f)
+    before = spec_cache_info()
+    for i in range(3):
+        cmd = Command(f)
+        cmd.sub_cmds()
+        assert(spec_of(Jim().g) is spec_of(Jim().g))
+        assert('self' in spec_of(Jim.g).params)
+        assert('self' not in spec_of(Jim().g).params)
+        assert(spec_of(str.upper) is spec_of(str.upper))
+    # Jim.g, Jim().g and str.upper were each analysed once
+    assert(spec_cache_info().misses - before.misses == 3)
+
+
+
+def test_spec_cache_weak():
+    def f(a): pass
+    spec = spec_of(f)
+    del f
+    gc.collect()
+    assert(spec.fn == None)
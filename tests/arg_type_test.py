@@ -1,6 +1,8 @@
 import pytest
+from array import array
 from inspect import Parameter
-from yaclipy.arg_spec import ArgType
+from yaclipy.arg_spec import ArgType, Packed
+from .testutil import exe, bind, bind_err
 
 
 
@@ -77,3 +79,67 @@ def test_argtype_custom():
         return 'y'
     a = ArgType(custom)
     assert(a.merge('{"a":[1,2,3]}',None) == 'y')
+
+
+
+def test_argtype_accumulate():
+    a = ArgType([int])
+    prev = [1]
+    acc = a.begin(prev)
+    for v in ['2', '0x3', '4']: acc = a.add(acc, v)
+    assert(a.finish(acc) == [1,2,3,4] and prev == [1])
+    f = ArgType(False)
+    acc = f.begin()
+    for v in [True, True, True]: acc = f.add(acc, v)
+    assert(f.finish(acc) == 3)
+    j = ArgType(dict)
+    acc = j.begin()
+    for v in ['[1]', '[2, 3]']: acc = j.add(acc, v)
+    assert(j.finish(acc) == [1,2,3])
+    with pytest.raises(ValueError):
+        a.add([], 'x')
+
+
+
+def test_argtype_packed():
+    a = ArgType(array('d'))
+    assert(str(a) == "array('d')")
+    assert(a.merge('1.5', array('d', [1])) == array('d', [1, 1.5]))
+    with pytest.raises(ValueError):
+        a.merge(True, Parameter.empty)
+    with pytest.raises(ValueError):
+        ArgType(array('u'))
+
+
+
+def test_bind_packed():
+    def f(x:array('i'), *, y=array('d')): return x, y
+    assert(exe(f, '1 0x10 -y# 1.5 -2') == (array('i', [1,16]), array('d', [1.5,-2])))
+    n = Packed.CHUNK * 2 + 5
+    assert(bind(f, ['1', '-y#'] + [str(i) for i in range(n)]) == ([array('i', [1])], [('y', array('d', range(n)))]))
+    assert(bind_err(f, ['-y#'] + ['1']*(n-1) + ['x']) == {'TYPE_MISMATCH', 'NO_VALUE'})
+    assert(bind_err(f, '1 x 3') == {'TYPE_MISMATCH'})
+    assert(bind_err(f, '1 99999999999') == {'TYPE_MISMATCH'})
+
+
+
+def test_bind_packed_coerce():
+    def f(*, x=array('q'), y:[int]=[], z=0): return x, y, z
+    # The same converter as a list, however the values are batched
+    assert(exe(f, '-x# 010 11 0x10 -y# 010 11 0x10') == (array('q', [8,11,16]), [8,11,16], 0))
+    n = Packed.CHUNK + 3
+    vals = [str(i) for i in range(n)]
+    assert(bind(f, ['-x#'] + vals + ['\\5', '-6', '-', '-z', '7']) == ([], [('x', array('q', list(range(n)) + [5, -6])), ('z', 7)]))
+    assert(exe(f, ['-x#3', '1', '2', '3', '-z', '4']) == (array('q', [1,2,3]), [], 4))
+    assert(bind_err(f, ['-x#', '1', str(1<<70)]) == {'TYPE_MISMATCH'})
+
+
+
+def test_bind_packed_numpy():
+    np = pytest.importorskip('numpy')
+    def f(*, x=np.empty(0, dtype=np.int32)): return x
+    x = exe(f, '-x# 1 2 0x3')
+    assert(x.dtype == np.int32 and list(x) == [1,2,3])
+    def g(*, x=np.empty(0, dtype=np.int8)): return x
+    assert(list(exe(g, '-x# 010 -3')) == [8, -3])
+    assert(bind_err(g, '-x# 1 300') == {'TYPE_MISMATCH'})
@@ -0,0 +1,110 @@
+import pytest, io
+from yaclipy import Command
+from yaclipy.exceptions import CallError, ArgFileError
+from yaclipy.argv import ArgvCursor, classify, VALUE, TERM, DASHES, KEYWORD, BAD
+from yaclipy.arg_spec import ArgSpec
+from .testutil import bind, bind_err
+
+
+
+def test_classify():
+    assert(classify('abc') == (VALUE, 'abc'))
+    assert(classify('\\-x') == (VALUE, '-x'))
+    assert(classify('\\') == (VALUE, ''))
+    assert(classify('-.3') == (VALUE, '-.3'))
+    assert(classify('-1e5') == (VALUE, '-1e5'))
+    assert(classify('-5x') == (BAD, None))
+    assert(classify('-.') == (BAD, None))
+    assert(classify('-') == (TERM, None))
+    assert(classify('---') == (DASHES, None))
+    assert(classify('-vx') == (KEYWORD, (1, 'vx', False)))
+    assert(classify('--key#') == (KEYWORD, (2, 'key', '')))
+    assert(classify('--key#12') == (KEYWORD, (2, 'key', '12')))
+    assert(classify('--#3')[0] == BAD)
+
+
+
+def test_cursor():
+    argv = ArgvCursor(['--', 'a', '-b'])
+    assert(argv.grab() == None and argv.head == '-')
+    assert(argv.grab() == None and argv.head == 'a')
+    assert(argv.rest() == ['a', '-b'])
+    assert(argv.grab() == 'a')
+    assert(argv.grab() == None and argv.kind == KEYWORD)
+    assert(argv.take() == ['-b'])
+    assert(not argv)
+
+
+
+def test_number_like():
+    def f(a, b:int=0, *args, c=False): return a, b, args, c
+    assert(bind_err(f, ['-3', '-c', '-5x']) == {'BAD_KW'})
+    assert(bind_err(f, ['-3', '-c', '-.']) == {'BAD_KW'})
+    # Still values where a value is wanted, like before
+    assert(bind(f, ['-5x', '-7', '-c']) == (['-5x', -7], [('c', True)]))
+
+
+
+def test_cursor_is_shared():
+    def f(a, *args): pass
+    argv = ArgvCursor(iter(['1', 'x', 'y']))
+    assert(ArgSpec(f)(argv).args == ['1', 'x', 'y'])
+    assert(not argv)
+
+
+
+def test_bind_many():
+    def f(*, files:[]): pass
+    files = [str(i) for i in range(100000)]
+    assert(bind(f, ['--files#'] + files)[1][0][1] == files)
+
+
+
+def test_response_file(tmp_path):
+    def f(a:int, *, files:[], n:[float]=[]): return a, files, n
+    (tmp_path/'args').write_text('3\n--files#\n\nx.txt\n\\-y.txt\n-\n')
+    (tmp_path/'nums').write_text('\n'.join(map(str, range(1000))))
+    inv = Command(f)([f'@{tmp_path/"args"}', '--n#', f'@{tmp_path/"nums"}'], response_files=True)
+    assert(inv.run_spec.args == [3])
+    assert(inv.run_spec.kwargs == {'files':['x.txt', '-y.txt'], 'n':list(range(1000))})
+    # Not expanded unless asked for
+    assert(bind(f, f'0 --files @{tmp_path/"args"}') == ([0], [('files', [f'@{tmp_path/"args"}'])]))
+
+
+
+def test_response_file_stdin(monkeypatch):
+    def f(*files): pass
+    monkeypatch.setattr('sys.stdin', io.StringIO('a\nb\n-c\n'))
+    assert(Command(f)(['x', '@-', 'y'], response_files=True).run_spec.args == ['x', 'a', 'b', '-c', 'y'])
+
+
+
+def test_response_file_type_error(tmp_path):
+    def f(*, n:[int]): pass
+    (tmp_path/'nums').write_text('1\n2\nthree\n4\n')
+    with pytest.raises(CallError) as e:
+        Command(f)(['--n#', f'@{tmp_path/"nums"}'], response_files=True)
+    assert([code for code, _ in e.value.cmd.run_spec.errors] == ['TYPE_MISMATCH'])
+
+
+
+@pytest.mark.parametrize('argv', [['--n#', '@-'], ['@-']])
+def test_response_file_type_error_stops(monkeypatch, argv):
+    read = []
+    def lines():
+        for i in range(100000):
+            read.append(i)
+            yield 'x\n' if i == 1 else f'{i}\n'
+    monkeypatch.setattr('sys.stdin', lines())
+    def f(n:[int], *rest): pass
+    def g(*, n:[int]): pass
+    with pytest.raises(CallError) as e:
+        Command(f if argv == ['@-'] else g)(argv, response_files=True)
+    assert([code for code, _ in e.value.cmd.run_spec.errors] == ['TYPE_MISMATCH'])
+    assert(len(read) < 10)
+
+
+
+def test_response_file_missing(tmp_path):
+    with pytest.raises(ArgFileError):
+        Command(lambda *a: None)([f'@{tmp_path/"nope"}'], response_files=True)
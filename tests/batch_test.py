@@ -0,0 +1,71 @@
+import io, json, sys, asyncio, subprocess, pytest
+from yaclipy import sub_cmds, config_var, get_config
+from yaclipy.batch import parse, run_many, batch
+
+
+def add(*, _input, b:int=0):
+    if b < 0: raise ValueError('negative')
+    return _input + b
+
+
+async def slow(*, _input, delay:float=0):
+    await asyncio.sleep(delay)
+    return _input
+
+
+def cfg(*, _input):
+    seen = getattr(get_config(), 'seen', [])
+    get_config().seen = seen + [_input]
+    return len(get_config().seen)
+
+
+@sub_cmds(add, slow, cfg)
+def root(a:int):
+    return a
+
+
+def collect(lines, **kwargs):
+    records = []
+    failed = run_many(root, lines, report=records.append, **kwargs)
+    return failed, records
+
+
+
+def test_parse():
+    assert(parse("  1 add -b '2 3'  ") == ['1', 'add', '-b', '2 3'])
+    assert(parse('["1", "add", "-b", "2"]') == ['1', 'add', '-b', '2'])
+    assert(parse('["1"]', 'shell') == ['[1]'])
+    assert(parse('') == None and parse('# comment') == None)
+    with pytest.raises(ValueError):
+        parse('{"a": 1}', 'json')
+
+
+def test_run_many():
+    failed, records = collect(['1 add -b 2', '', '["5"]', '2 add -b -1', '3 nope', '["6", 7', 'x', '4 add --c 3'])
+    assert(failed == 5)
+    assert([r['line'] for r in records] == [1, 3, 4, 5, 6, 7, 8])
+    assert([r.get('result') for r in records] == [3, 5, None, None, None, None, None])
+    assert([r.get('error') for r in records] == [None, None, 'ValueError', 'CommandNotFound', 'JSONDecodeError', 'CallError', 'CallError'])
+    assert(records[3]['message'].startswith('Command not found'))
+    assert(records[6]['errors'] == ["Unknown parameter: -c '3'"])
+
+
+def test_ordered_jobs():
+    lines = [f'{i} slow --delay {0.01 * (5 - i)}' for i in range(5)]
+    failed, records = collect(lines, jobs=5)
+    assert(failed == 0 and [r['result'] for r in records] == list(range(5)))
+
+
+def test_isolated_config():
+    failed, records = collect(['1 cfg', '2 cfg', '3 cfg'], jobs=2)
+    assert([r['result'] for r in records] == [1, 1, 1])
+    assert(not hasattr(get_config(), 'seen'))
+
+
+def test_main(tmp_path):
+    path = tmp_path / 'lines.txt'
+    path.write_text('1 add -b 1\n2 add -b -2\n')
+    out = subprocess.run([sys.executable, '-m', 'yaclipy.batch', 'tests.batch_test:root', str(path)], capture_output=True, text=True)
+    assert(out.returncode == 1)
+    records = [json.loads(l) for l in out.stdout.splitlines()]
+    assert([(r['ok'], r.get('result')) for r in records] == [(True, 2), (False, None)])
@@ -206,3 +206,42 @@ def test_call_class():
     
     v = exe(Bob(3), 'g')
     assert(v == 'jim:9')
+
+
+
+def test_sync_chain():
+    from yaclipy import Command, jobs
+    def leaf(*, _input):
+        return _input + 1
+    async def aleaf(*, _input):
+        return _input + 2
+    @sub_cmds(leaf)
+    def mid(*, _input):
+        yield _input
+        yield _input * 10
+    @sub_cmds(mid, aleaf)
+    def top(x:int):
+        return x
+    assert(Command(top)(['1', 'mid', 'leaf']).sync)
+    assert(not Command(top)(['1', 'aleaf']).sync)
+    assert(exe(top, '1 mid leaf') == [2, 11])
+    assert(exe(top, '1 aleaf') == 3)
+    assert(Command(top)(['2', 'mid', 'leaf']).run(reduce='sum') == 3 + 21)
+    assert(not Command(jobs(2)(top))(['1', 'mid', 'leaf']).sync)
+
+
+
+def test_sync_context():
+    import contextvars
+    from yaclipy import Command, get_config, set_config
+    var = contextvars.ContextVar('var', default=0)
+    def change():
+        var.set(1)
+        return set_config()
+    cfg = get_config()
+    def sync(): return change()
+    async def coro(): return change()
+    for fn in (sync, coro):
+        assert(Command(fn)([]).sync == (fn == sync))
+        assert(Command(fn)([]).run(show=False) is not cfg)
+        assert(var.get() == 0 and get_config() is cfg)
@@ -2,6 +2,7 @@ import pytest
 from yaclipy import Command, sub_cmds
 from yaclipy.command import CommandNotFound
 from yaclipy.exceptions import *
+from yaclipy.arg_spec import spec_cache_info
 from .testutil import exe
 
 
@@ -51,3 +52,50 @@ def test_CommandNotFound():
     def f(): pass
     with pytest.raises(CommandNotFound):
         Command(f)(['toss'])
+
+
+
+def test_sub_cmds_lazy():
+    class Big():
+        pass
+    for i in range(100):
+        setattr(Big, f'cmd{i:03}', (lambda i: lambda self: i)(i))
+    def f() -> Big: pass
+    cmd = Command(f)
+    cmd.argspec
+    before = spec_cache_info().misses
+    assert(cmd(['cmd042']).next_cmd.run(Big()) == 42)
+    assert(spec_cache_info().misses - before == 1)
+    with pytest.raises(AmbiguousCommand):
+        cmd(['cmd04'])
+    assert(cmd.sub_cmds() is cmd.sub_cmds())
+    assert(len(cmd.sub_cmds()) == 100)
+
+
+
+def test_sub_cmds_lookup():
+    subs = Command(lambda: None).sub_cmds()
+    assert(not subs and subs.lookup('') == {})
+    def f() -> HasCmds: pass
+    subs = Command(f).sub_cmds()
+    assert(subs.lookup('fo').keys() == {'foo', 'foo_'})
+    assert(subs.lookup('b').keys() == {'boink', 'break_'})
+    assert(subs.lookup('x') == {})
+    with pytest.raises(KeyError):
+        subs['x']
+
+
+
+def test_sub_cmds_ref(tmp_path, monkeypatch):
+    (tmp_path/'lazy_cmds.py').write_text('def deploy(env): return "deploy " + env\n\nclass Grp:\n    def ship(): return "ship"\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    @sub_cmds('lazy_cmds:deploy', go='lazy_cmds:Grp.ship')
+    def f(): pass
+    cmd = Command(f)
+    assert(cmd.sub_cmds().keys() == {'deploy', 'go'})
+    assert(cmd.sub_cmds().lookup('dep').keys() == {'deploy'})
+    assert('lazy_cmds' not in __import__('sys').modules)
+    bound = cmd(['deploy', 'prod'])
+    assert('lazy_cmds' in __import__('sys').modules)
+    assert(bound.next_cmd.run() == 'deploy prod')
+    assert(cmd(['go']).next_cmd.run() == 'ship')
@@ -0,0 +1,85 @@
+import sys, json, subprocess
+from typing import Literal
+from yaclipy import sub_cmds
+from yaclipy.manifest import Manifest
+from yaclipy.complete import Completer, script
+
+
+def deploy(env:Literal['prod', 'test'], hosts:[str]=[], /, *, retries__r=3, force__f=False, all__a=False, tags:[str]=[]):
+    pass
+
+def destroy(*, yes__y=False):
+    pass
+
+def dump(): pass
+
+@sub_cmds(deploy, destroy, dump, status_=dump)
+def root(*, verbose__v=False, level:Literal['1','2']='1'):
+    pass
+
+
+
+def test_complete():
+    complete = Completer(Manifest.build(root).data)
+    assert(complete([]) == ['deploy', 'destroy', 'dump', 'status'])
+    assert(complete(['d']) == ['deploy', 'destroy', 'dump'])
+    assert(complete(['de']) == ['deploy', 'destroy'])
+    assert(complete(['-']) == ['--help', '--level', '--verbose', '-h', '-v'])
+    assert(complete(['--l']) == ['--level'])
+    assert(complete(['--level', '']) == ['1', '2'])
+    assert(complete(['-v', '--level', '2', 'st']) == ['status'])
+    # Positional values and sub-command prefixes
+    assert(complete(['-v', 'dep', '']) == ['prod', 'test'])
+    assert(complete(['-v', 'dep', 'p']) == ['prod'])
+    assert(complete(['de', 'x', '']) == []) # Ambiguous
+    assert(complete(['dep', 'prod', 'a', 'b', '--r']) == ['--retries'])
+    # Clustered short flags, and lists
+    assert(complete(['dep', 'prod', '-f']) == ['-f'])
+    assert(complete(['dep', 'prod', '-fa']) == ['-fah', '-far'])
+    assert(complete(['dep', 'prod', '-fr']) == [])
+    assert(complete(['dep', 'prod', '--tags#', 'a', 'b', '-', '']) == [])
+    assert(complete(['dep', 'prod', '--tags#', 'a', '--f']) == ['--force'])
+    assert(complete(['dep', 'prod', '--tags#2', 'a', '-']) == [])
+    assert(complete(['dep', 'prod', '--tags#1', 'a', '-']) == ['--all', '--force', '--help', '--retries', '--tags', '-a', '-f', '-h', '-r'])
+
+
+
+def test_complete_load(tmp_path):
+    path = str(tmp_path/'cli.manifest')
+    assert(Completer.load(path) == None)
+    complete = Completer.load(path, f'{__name__}:root')
+    assert(complete(['des']) == ['destroy'])
+    assert(Completer.load(path).data == complete.data)
+    for shell in ['bash', 'zsh', 'fish']:
+        assert(path in script(shell, 'my-app', path))
+    # A completion request doesn't import any commands
+    out = subprocess.run([sys.executable, '-c', f'import sys; from yaclipy.complete import main; main(sys.argv[1:]); print(sorted(m for m in sys.modules if m.startswith("yaclipy")))',
+        'query', path, '--', 'dep', 'prod', '--re'], capture_output=True, text=True, check=True).stdout.splitlines()
+    assert(out == ['--retries', "['yaclipy', 'yaclipy.argv', 'yaclipy.complete', 'yaclipy.sources']"])
+
+
+
+def big_tree(n=500):
+    ''' A manifest with `n` commands: 20 groups of 25 commands, each with 10 parameters.
+    '''
+    nodes = []
+    def node(name, subs={}):
+        params = [{'name':f'p{i}', 'kind':'KEYWORD_ONLY', 'required':False, 'aliases':[f'param-{name}-{i}', f'{chr(97+i)}'],
+                'type': 'int' if i%3 else 'bool', 'repeated': i==4, 'choices': ['x','y','z'] if i==5 else None, 'default': 0} for i in range(10)]
+        nodes.append(json.dumps({'name':name, 'ref':None, 'doc':'', 'params':params, 'sub':subs}))
+        return len(nodes) - 1
+    node('root', {})
+    groups = {f'group{g:02}': node(f'group{g:02}', {f'cmd{c:02}': node(f'cmd{c:02}') for c in range(n//20 - 1)}) for g in range(20)}
+    nodes[0] = nodes[0].replace('"sub": {}', '"sub": ' + json.dumps(groups))
+    return {'version':2, 'sources':{}, 'nodes':nodes}
+
+
+
+def test_complete_big(tmp_path):
+    # The latency budget is checked by benchmarks/complete.py.  Here: only the nodes that are walked are decoded.
+    path = tmp_path/'big.manifest'
+    path.write_text(json.dumps(big_tree()))
+    for words, walked in [([], 1), (['gro'], 1), (['group07', 'cm'], 2), (['group07', 'cmd03', '--par'], 3), (['group19', 'cmd22', '--param-cmd22-5', ''], 3)]:
+        complete = Completer.load(str(path))
+        assert(complete(words))
+        assert(len(complete._nodes) == walked)
@@ -0,0 +1,57 @@
+import pytest, enum, pathlib
+from typing import List, Optional, Literal, Sequence
+from yaclipy.arg_spec import ArgType
+from yaclipy.converters import converter, register
+from .testutil import exe, bind_err
+
+
+class Color(enum.Enum):
+    RED = 1
+    GREEN = 2
+
+
+
+def test_converter_lists():
+    assert(converter(List[int])[1:] == ('int', True))
+    assert(converter(list[float])[1:] == ('float', True))
+    assert(converter(Sequence[str])[1:] == ('str', True))
+    assert(converter(List)[1:] == ('str', True))
+    assert(converter(Optional[List[int]])[1:] == ('int', True))
+    assert(converter([Color])[1:] == ('Color', True))
+    assert(converter(Optional[int])[0]('0x10') == 16)
+
+
+
+def test_converter_literal():
+    coerce, name, _ = converter(Literal['a', 'b'])
+    assert(name == 'a|b' and coerce('a') == 'a')
+    with pytest.raises(ValueError):
+        coerce('c')
+    coerce, name, _ = converter(Literal[1, 2])
+    assert(coerce('2') == 2)
+
+
+
+def test_converter_enum_path():
+    assert(converter(Color)[0]('GREEN') == Color.GREEN)
+    assert(converter(Color.RED)[1] == 'Color')
+    assert(converter(pathlib.Path)[0]('a/b') == pathlib.Path('a/b'))
+    assert(str(ArgType(pathlib.Path('.'))) == 'path')
+
+
+
+def test_converter_bind():
+    def f(c:Color, *, mode:Literal['fast','slow']='fast', paths:List[pathlib.Path]=[], n:Optional[int]=None):
+        return c, mode, paths, n
+    assert(exe(f, 'RED --mode slow --paths# a b - -n 0x3') == (Color.RED, 'slow', [pathlib.Path('a'), pathlib.Path('b')], 3))
+    assert(bind_err(f, 'BLUE --mode medium') == {'TYPE_MISMATCHx2', 'NO_VALUE'})
+
+
+
+def test_converter_register():
+    class Point(tuple): pass
+    @register(lambda ann: ann is Point)
+    def _point(ann):
+        return (lambda v: Point(map(float, v.split(',')))), 'x,y'
+    assert(str(ArgType([Point])) == '[x,y]')
+    assert(ArgType(Point).merge('1,2', None) == (1.0, 2.0))
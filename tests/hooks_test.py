@@ -0,0 +1,111 @@
+import asyncio, pytest
+from print_ext import Printer, StringIO
+from yaclipy import Command, sub_cmds, hooks
+from yaclipy.profile import Profile
+
+
+def double(*, _input):
+    return _input * 2
+
+
+async def adouble(*, _input):
+    await asyncio.sleep(0)
+    return _input * 2
+
+
+@sub_cmds(double, adouble)
+def nums(n=3):
+    yield from range(n)
+
+
+@sub_cmds(double, adouble)
+async def anums(n=3):
+    for i in range(n):
+        yield i
+
+
+
+class Recorder():
+    def __init__(self):
+        self.events = []
+
+    def on_bind(self, cmd, run_spec, timings):
+        assert(set(timings) == {'signature', 'bind', 'lookup'})
+        self.events.append(('bind', cmd.name))
+
+    def on_call_start(self, bound, input):
+        self.events.append(('start', bound.cmd.name, input))
+
+    def on_call_end(self, bound, seconds, error):
+        assert(seconds >= 0)
+        self.events.append(('end', bound.cmd.name, error))
+
+    def on_yield(self, bound, value):
+        self.events.append(('yield', bound.cmd.name, value))
+
+    def on_output(self, bound, value, seconds):
+        self.events.append(('output', bound.cmd.name, value))
+
+
+def recorded(fn, argv, **kwargs):
+    rec = hooks.add(Recorder())
+    try:
+        result = Command(fn)(argv).run(output='raw', **kwargs)
+    finally:
+        hooks.remove(rec)
+    return result, rec.events
+
+
+
+@pytest.mark.parametrize('fn,sub', [(nums, 'double'), (nums, 'adouble'), (anums, 'double'), (anums, 'adouble')])
+def test_events(fn, sub, capsys):
+    result, events = recorded(fn, ['2', sub])
+    assert(result == [0, 2])
+    assert(events[:2] == [('bind', fn.__name__), ('bind', sub)])
+    assert(events[2] == ('start', fn.__name__, None))
+    assert(events[-1] == ('end', fn.__name__, None))
+    assert(events[3:-1] == [
+        ('yield', fn.__name__, 0), ('start', sub, 0), ('output', sub, 0), ('end', sub, None),
+        ('yield', fn.__name__, 1), ('start', sub, 1), ('output', sub, 2), ('end', sub, None),
+    ])
+    assert(capsys.readouterr().out == '0\n2\n')
+
+
+def test_error():
+    def fail():
+        raise KeyError('x')
+    rec = hooks.add(Recorder())
+    try:
+        with pytest.raises(KeyError):
+            Command(fail)([]).run()
+    finally:
+        hooks.remove(rec)
+    assert(rec.events[-1][:2] == ('end', 'fail'))
+    assert(isinstance(rec.events[-1][2], KeyError))
+
+
+def test_no_hooks():
+    assert(hooks.HOOKS == [])
+    assert(Command(nums)(['2', 'double']).run(show=False) == [0, 2])
+
+
+
+def test_profile(tmp_path):
+    stacks, pstats = tmp_path / 'stacks.txt', tmp_path / 'pstats'
+    with Profile(pstats=str(pstats), collapsed=str(stacks)) as prof:
+        Command(anums)(['3', 'adouble']).run(show=False)
+        Command(anums)(['2', 'adouble']).run(show=False)
+    assert(hooks.HOOKS == [])
+    rows = {row['path']: row for row in prof.rows()}
+    assert(list(rows) == [('anums',), ('anums', 'adouble')])
+    assert(rows[('anums',)]['calls'] == 2 and rows[('anums',)]['yields'] == 5)
+    assert(rows[('anums', 'adouble')]['calls'] == 5)
+    assert(rows[('anums',)]['total'] >= rows[('anums', 'adouble')]['total'])
+    paths = [line.rsplit(' ', 1)[0] for line in stacks.read_text().splitlines()]
+    assert(set(paths) <= {'anums', 'anums;<bind>', 'anums;adouble', 'anums;adouble;<bind>'})
+    assert('anums;<bind>' in paths)
+    assert(sorted(p.name for p in pstats.iterdir()) == ['anums.adouble.pstats', 'anums.pstats'])
+    out = Printer.using(StringIO)(ascii=True, color=False)
+    out.pretty(prof)
+    text = str(out)
+    assert('Command' in text and 'adouble' in text)
@@ -0,0 +1,42 @@
+import sys, subprocess
+
+
+SCRIPT = '''
+import yaclipy
+def f(a:int, *, b:[float]=[], c=False): pass
+cmd = yaclipy.Command(f)
+cmd(['1', '--b#', '2', '3', '-', '-c'])
+'''
+
+# Modules that a successful, synchronous bind must not need
+LAZY = {'asyncio', 'json', 'print_ext', 'docstring_parser', 'yaclipy.exceptions', 'yaclipy.config', 'yaclipy.docs'}
+BUDGET = 60 # Number of modules imported on top of a bare interpreter
+
+
+def imported(script):
+    ''' The modules imported by `script`, according to ``-X importtime``.
+    '''
+    def run(script):
+        err = subprocess.run([sys.executable, '-X', 'importtime', '-c', script], capture_output=True, text=True, check=True).stderr
+        return {l.split('|')[-1].strip() for l in err.splitlines() if l.startswith('import time:') and not l.endswith('package')}
+    return run(script) - run('pass')
+
+
+
+def test_import_budget():
+    mods = imported(SCRIPT)
+    assert('yaclipy.command' in mods)
+    assert(not (mods & LAZY)), mods & LAZY
+    assert(len(mods) <= BUDGET), sorted(mods)
+
+
+
+def test_lazy_config():
+    mods = imported('import yaclipy; yaclipy.config_var')
+    assert('yaclipy.config' in mods and 'print_ext' in mods)
+
+
+
+def test_sync_run():
+    mods = imported(SCRIPT.rstrip() + '.run()\n')
+    assert(not (mods & {'asyncio', 'print_ext'})), mods
@@ -0,0 +1,61 @@
+import asyncio, pytest
+from yaclipy import Command, sub_cmds, jobs
+
+log = []
+
+
+async def fetch(*, _input):
+    global running, peak
+    running += 1
+    peak = max(peak, running)
+    await asyncio.sleep(0.01 * (10 - _input % 10))
+    running -= 1
+    if _input == 13: raise ValueError(_input)
+    log.append(_input)
+    return _input * 2
+
+
+@sub_cmds(fetch)
+def hosts(n:int):
+    yield from range(n)
+
+
+@jobs(3)
+@sub_cmds(fetch)
+async def ahosts(n:int):
+    for i in range(n):
+        yield i
+
+
+def reset():
+    global running, peak
+    running = peak = 0
+    log.clear()
+
+
+
+def test_sequential_by_default():
+    reset()
+    assert(Command(hosts)(['5', 'fetch']).run() == [0, 2, 4, 6, 8])
+    assert(peak == 1 and log == [0, 1, 2, 3, 4])
+
+
+def test_jobs_keep_order():
+    reset()
+    assert(Command(hosts)(['10', 'fetch']).run(jobs=4) == [i*2 for i in range(10)])
+    assert(peak == 4)
+    assert(log != sorted(log)) # They really did finish out of order
+
+
+def test_jobs_decorator():
+    reset()
+    assert(Command(ahosts)(['7', 'fetch']).run(jobs=100) == [i*2 for i in range(7)])
+    assert(peak == 3)
+
+
+def test_first_failure_cancels():
+    reset()
+    with pytest.raises(ValueError):
+        Command(hosts)(['30', 'fetch']).run(jobs=5)
+    assert(13 not in log and len(log) < 20)
+    assert(running > 0) # The others were cancelled mid-sleep (and never finished)
@@ -0,0 +1,110 @@
+import os, sys, json, pytest
+from yaclipy import Command
+from yaclipy.manifest import Manifest
+from yaclipy.exceptions import CmdHelp, CallError, CommandNotFound
+from print_ext import pretty
+from .testutil import tostr
+
+
+ROOT = '''
+from typing import Literal
+import yaclipy as CLI
+
+@CLI.sub_cmds('mf_deploy:deploy', 'mf_deploy:status')
+def root(*, verbose__v=False):
+    """ The root command """
+'''
+
+DEPLOY = '''
+from enum import Enum
+from typing import Literal
+
+class Env(Enum):
+    prod = 1
+    test = 2
+
+class Server:
+    def restart(self, *, hard=False):
+        """ Restart the server """
+    def self_(self):
+        """ The server again """
+
+Server.self_.__annotations__['return'] = Server
+
+def deploy(env:Env, hosts:[str]=[], /, *, retries__r=3, mode:Literal['fast', 'safe']='safe') -> Server:
+    """ Deploy the thing
+
+    More words.
+    """
+
+def status(*names, json_:dict={}, **kwargs):
+    """ Show the status """
+'''
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    (tmp_path/'mf_root.py').write_text(ROOT)
+    (tmp_path/'mf_deploy.py').write_text(DEPLOY)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    for m in ['mf_root', 'mf_deploy']: sys.modules.pop(m, None)
+
+
+def fresh(tree):
+    ''' Build and save the manifest, then forget the command modules.
+    '''
+    path = str(tree/'cli.manifest')
+    Manifest.build('mf_root:root').save(path)
+    for m in ['mf_root', 'mf_deploy']: sys.modules.pop(m, None)
+    return Manifest.load(path)
+
+
+
+def test_manifest_describe(tree):
+    m = Manifest.build('mf_root:root')
+    root = m.node(0)
+    assert(root['ref'] == 'mf_root:root' and root['sub'].keys() == {'deploy', 'status'})
+    deploy = m.node(root['sub']['deploy'])
+    assert(deploy['params'][0] == {'name':'env', 'kind':'POSITIONAL_ONLY', 'required':True, 'aliases':[], 'type':'Env', 'repeated':False, 'choices':['prod','test']})
+    assert(deploy['params'][2]['default'] == 3)
+    server = deploy['sub']['self_']
+    assert(m.node(server)['sub']['self_'] == server) # Recursive
+    assert(len(m.data['nodes']) == 6)
+
+
+
+def test_manifest_check(tree):
+    m = fresh(tree)
+    m.check(['-v', 'deploy', 'prod', 'a', 'b', '-r', '4', 'self', 'self', 'restart', '--hard'])
+    m.check(['status', 'x', 'y', '--json', '{}', '--other', '1'])
+    bad = ['deploy', 'staging', '--mode', 'slow', '-r', 'x']
+    with pytest.raises(CallError) as e:
+        m.check(bad)
+    errors = [tostr(x) for x in e.value.errors]
+    with pytest.raises(CmdHelp) as e:
+        m.check(['deploy', '-h'])
+    s = tostr(pretty(e.value))
+    assert('Deploy the thing' in s and 'More words.' in s and 'The server again' in s)
+    with pytest.raises(CommandNotFound) as e:
+        m.check(['deplyo'])
+    assert("deploy" in tostr(pretty(e.value.errors[1])))
+    assert('mf_root' not in sys.modules and 'mf_deploy' not in sys.modules)
+    # The same errors as the real command
+    with pytest.raises(CallError) as e:
+        Command('mf_root:root')(bad)
+    assert([tostr(x) for x in e.value.errors] == errors)
+
+
+
+def test_manifest_stale(tree):
+    path = str(tree/'cli.manifest')
+    m = Manifest.cached('mf_root:root', path)
+    assert(Manifest.load(path).data == m.data)
+    src = tree/'mf_deploy.py'
+    os.utime(src, ns=(0, 0))
+    assert(Manifest.load(path) != None) # Same contents
+    src.write_text(DEPLOY + '\ndef extra(): pass\n')
+    assert(Manifest.load(path) == None)
+    (tree/'cli.manifest').write_text('garbage')
+    assert(Manifest.load(path) == None)
@@ -0,0 +1,82 @@
+import asyncio, time, threading
+from yaclipy import Command, sub_cmds, blocking, get_config
+
+DELAY = 0.2
+
+
+def slow(*, _input):
+    time.sleep(DELAY)
+    return threading.current_thread() is threading.main_thread()
+
+
+@blocking
+def offloaded(*, _input):
+    return slow(_input=_input)
+
+
+@blocking
+def lines(n:int):
+    for i in range(n):
+        time.sleep(DELAY)
+        yield i
+
+
+@sub_cmds(slow, offloaded, lines)
+async def produce(n:int):
+    for i in range(n):
+        await asyncio.sleep(0)
+        yield i
+
+
+
+async def heartbeat(task):
+    ''' The longest gap between ticks while `task` is running.
+    '''
+    gap, last = 0, time.perf_counter()
+    while not task.done():
+        await asyncio.sleep(0.01)
+        now = time.perf_counter()
+        gap, last = max(gap, now - last), now
+    return gap, await task
+
+
+def beat(argv, **kwargs):
+    async def main():
+        return await heartbeat(Command(produce)(argv).run(**kwargs))
+    return asyncio.run(main())
+
+
+
+def test_blocks_without_offload():
+    gap, result = beat(['2', 'slow'])
+    assert(gap > DELAY * 0.9 and result == [True, True])
+
+
+def test_blocking_decorator():
+    gap, result = beat(['2', 'offloaded'])
+    assert(gap < DELAY / 2 and result == [False, False])
+
+
+def test_offload_all():
+    gap, result = beat(['2', 'slow'], offload=True, threads=2)
+    assert(gap < DELAY / 2 and result == [False, False])
+
+
+def test_blocking_generator():
+    gap, result = beat(['1', 'lines', '2'])
+    assert(gap < DELAY / 2 and result == [[0, 1]])
+
+
+def test_overlap_with_jobs():
+    t = time.perf_counter()
+    assert(Command(produce)(['4', 'offloaded']).run(jobs=4, threads=4) == [False]*4)
+    assert(time.perf_counter() - t < DELAY * 3)
+
+
+def test_config_context():
+    @blocking
+    def there(*, _input):
+        return get_config()
+    async def one():
+        yield 1
+    assert(Command(sub_cmds(there)(one))(['there']).run() == [get_config()])
@@ -0,0 +1,112 @@
+import io, json, pytest
+from array import array
+from collections import deque
+from yaclipy import Command, sub_cmds
+from yaclipy.output import sink, bounded, Summary, JsonLines, Delimited, Raw, Pretty
+
+
+def row(*, _input):
+    return _input
+
+
+@sub_cmds(row)
+def rows():
+    yield {'id': 1, 'name': 'a,b'}
+    yield {'name': 'c', 'id': 2, 'extra': True}
+    yield [3, 'd']
+    yield 'e'
+
+
+def written(output):
+    out = io.StringIO()
+    s = sink(output, out)
+    Command(rows)(['row']).run(stream=True, output=s)
+    return out.getvalue()
+
+
+
+def test_jsonl():
+    lines = written('jsonl').splitlines()
+    assert([json.loads(l) for l in lines] == [{'id': 1, 'name': 'a,b'}, {'name': 'c', 'id': 2, 'extra': True}, [3, 'd'], 'e'])
+
+
+def test_csv():
+    assert(written('csv') == 'id,name\n1,"a,b"\n2,c\n3,d\ne\n')
+    assert(written('tsv') == 'id\tname\n1\ta,b\n2\tc\n3\td\ne\n')
+
+
+def test_raw():
+    assert(written('raw').splitlines()[-2:] == ["[3, 'd']", 'e'])
+
+
+def test_pretty():
+    assert('a,b' in written('pretty'))
+
+
+def test_sink():
+    assert(isinstance(sink(None, io.StringIO()), Pretty))
+    assert(isinstance(sink('auto', io.StringIO()), JsonLines)) # Not a terminal
+    with pytest.raises(ValueError):
+        sink('xml')
+
+
+def test_stdout(capfd):
+    Command(rows)(['row']).run(output='raw')
+    assert(capfd.readouterr().out.splitlines()[-1] == 'e')
+
+
+
+def shown(val, output='pretty'):
+    out = io.StringIO()
+    sink(output, out).write(val)
+    return out.getvalue()
+
+
+def test_summary():
+    text = shown(list(range(10**6)))
+    assert(text.startswith('list (1,000,000 items; of type int)'))
+    assert('999999' in text and '500000' not in text)
+    text = shown({'rows': [str(i) for i in range(5000)], 'n': 5000})
+    assert('list (5,000 items; of type str)' in text and '4999' in text and '2500' not in text)
+    assert(shown([1, 2]) == shown([1, 2], 'full'))
+
+
+def test_summary_lazy():
+    import itertools
+    it = itertools.count()
+    assert(shown(it).startswith('count (lazy; of type int)'))
+    assert(next(it) == 11) # Only consumed as far as needed
+
+
+def test_full():
+    val = [f'v{i}' for i in range(40)]
+    out = io.StringIO()
+    Pretty(out, large=30).write(val)
+    assert('v20' not in out.getvalue() and 'v39' in out.getvalue())
+    assert('v20' in shown(val, 'full'))
+
+
+
+def test_summary_nested():
+    small = [[1, 2]] * 10
+    assert(bounded(small) is small)
+    assert(isinstance(bounded([list(range(1000))] * 1000), Summary)) # Only about 1000 items are looked at
+    assert(isinstance(bounded([[1, 2]] * 400), Summary))
+    wide = bounded({'rows': list(range(5000)), 'n': 1})
+    assert(isinstance(wide['rows'], Summary) and wide['n'] == 1)
+    out = io.StringIO()
+    Pretty(out, large=40).write([list(range(100))] * 50)
+    assert(len(out.getvalue().splitlines()) < 100) # Not 5000
+
+
+
+def test_summary_packed():
+    big = array('d', range(10**5))
+    s = bounded(big)
+    assert(isinstance(s, Summary) and s.size == 10**5 and s.nbytes == 8 * 10**5)
+    assert(isinstance(bounded(memoryview(big)), Summary) and isinstance(bounded(deque(range(5000))), Summary))
+    grid = memoryview(bytes(6000)).cast('B', (2, 3000))
+    assert(bounded(grid) is grid and Summary(grid).head == {})
+    out = io.StringIO()
+    Pretty(out).write(big)
+    assert('800,000 bytes' in out.getvalue() and len(out.getvalue().splitlines()) < 30)
@@ -0,0 +1,58 @@
+import asyncio, time, pytest
+from yaclipy import Command, sub_cmds, pipeline
+
+DELAY = 0.02
+made = []
+
+
+async def store(*, _input):
+    if _input == 'X': raise ValueError(_input)
+    await asyncio.sleep(DELAY)
+    return (_input, len(made))
+
+
+@sub_cmds(store)
+async def fetch(n:int, *, fail=False):
+    for i in range(n):
+        await asyncio.sleep(DELAY)
+        made.append(i)
+        yield i
+    if fail: raise KeyError('fetch')
+
+
+@pipeline(2)
+@sub_cmds(store)
+async def letters(s):
+    for x in s:
+        made.append(x)
+        yield x
+
+
+
+def test_sequential():
+    made.clear()
+    t = time.perf_counter()
+    assert(Command(fetch)(['4', 'store']).run() == [(i, i+1) for i in range(4)])
+    assert(time.perf_counter() - t > 8 * DELAY)
+
+
+def test_prefetch_overlaps():
+    made.clear()
+    result = Command(fetch)(['6', 'store']).run(buffer=4)
+    assert([v for v, _ in result] == list(range(6)))
+    assert(result[0][1] > 1) # The next value was fetched while the first was stored
+
+
+def test_backpressure():
+    made.clear()
+    # The queue holds 2, and one more is waiting to be put.
+    assert(Command(letters)(['abcdef', 'store']).run() == [(x, min(i+4, 6)) for i, x in enumerate('abcdef')])
+
+
+def test_errors():
+    with pytest.raises(KeyError):
+        Command(fetch)(['2', '--fail', 'store']).run(buffer=4)
+    made.clear()
+    with pytest.raises(ValueError):
+        Command(letters)(['aXcdefg', 'store']).run()
+    assert(len(made) < 7) # The producer was stopped
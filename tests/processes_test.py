@@ -0,0 +1,100 @@
+import os, pickle, threading, time, pytest
+from print_ext import PrettyException
+from yaclipy import Command, sub_cmds, processes
+from yaclipy.exceptions import WorkerError
+
+
+class Odd(PrettyException): pass
+
+
+def square(*, _input, fail=0):
+    if fail and _input == fail: raise Odd(msg=f'bad {_input}')
+    if fail and _input == -fail: raise Odd(msg=f'locked {_input}', lock=threading.Lock()) # Can't be pickled
+    return _input * _input, os.getpid() != PARENT
+
+
+def row(*, _input, wait=0.0):
+    if _input < 3: time.sleep(wait) # The first chunk finishes last
+    return {'n': _input, 'square': _input * _input}
+
+
+def pids(*, _input):
+    yield _input
+    yield -_input
+
+
+@sub_cmds(pids)
+def quiet(*, _input):
+    return None
+
+
+@processes(2, chunksize=3)
+@sub_cmds(square, row, pids)
+def nums(n:int):
+    yield from range(n)
+
+
+@processes(2, ordered=False)
+@sub_cmds(square)
+async def anums(n:int):
+    for i in range(n):
+        yield i
+
+
+PARENT = os.getpid()
+
+
+
+def test_pickle_bound():
+    bound = Command(nums)(['3', 'square', '--fail', '2'])
+    again = pickle.loads(pickle.dumps(bound.next_cmd))
+    assert(again.name == 'square' and again.run_spec.kwargs == {'fail': 2})
+    assert(again.run(4) == (16, False))
+
+
+def test_ordered():
+    assert(Command(nums)(['7', 'square']).run() == [(i*i, True) for i in range(7)])
+
+
+def test_unordered():
+    assert(sorted(Command(anums)(['6', 'square']).run()) == [(i*i, True) for i in range(6)])
+
+
+def test_stream():
+    assert(Command(nums)(['5', 'pids']).run(reduce='sum') == 0)
+    assert(Command(nums)(['5', 'pids']).run(reduce='count') == 10)
+    assert(Command(nums)(['3', 'pids']).run() == [[0, 0], [1, -1], [2, -2]])
+
+
+def test_csv(capfd):
+    assert(Command(nums)(['5', 'row']).run(output='csv') == [{'n': i, 'square': i*i} for i in range(5)])
+    assert(capfd.readouterr().out.splitlines() == ['n,square'] + [f'{i},{i*i}' for i in range(5)])
+    assert(Command(nums)(['3', 'pids']).run(output='csv', reduce='count') == 6)
+    assert(capfd.readouterr().out.splitlines() == ['0', '0', '1', '-1', '2', '-2'])
+    # Shown in the order that the values were yielded, not the order that the workers finish
+    Command(nums)(['6', 'row', '--wait', '0.5']).run(output='csv')
+    assert(capfd.readouterr().out.splitlines() == ['n,square'] + [f'{i},{i*i}' for i in range(6)])
+
+
+
+def test_errors():
+    with pytest.raises(Odd) as e:
+        Command(nums)(['9', 'square', '--fail', '4']).run()
+    assert(e.value.msg == 'bad 4')
+    with pytest.raises(WorkerError) as e:
+        Command(nums)(['9', 'square', '--fail', '-5']).run()
+    assert(e.value.name == 'Odd' and 'locked 5' in e.value.text)
+
+
+
+def test_close_py38(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from yaclipy.command import Run
+    class Pool(ThreadPoolExecutor):
+        def shutdown(self, wait=True): # No cancel_futures before Python 3.9
+            super().shutdown(wait)
+    run = Run()
+    pool = run.executor(Pool, 1)
+    monkeypatch.setattr('yaclipy.command.CANCEL_FUTURES', False)
+    run.close()
+    assert(run.executors == {} and pool._shutdown)
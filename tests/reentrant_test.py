@@ -0,0 +1,60 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from yaclipy import Command, sub_cmds
+from yaclipy.command import BoundInvocation
+
+seen = []
+
+
+def leaf(*, _input, tag=''):
+    seen.append((_input, tag))
+
+
+async def aleaf(*, _input, tag=''):
+    await asyncio.sleep(0)
+    seen.append((_input, tag))
+
+
+@sub_cmds(leaf, aleaf)
+def root(n:int):
+    return n
+
+
+cmd = Command(root)
+
+
+
+def test_bind_does_not_mutate():
+    a = cmd(['1', 'leaf', '--tag', 'a'])
+    b = cmd(['2', 'aleaf'])
+    assert(isinstance(a, BoundInvocation) and a.cmd is cmd)
+    assert(a.run_spec.args == [1] and b.run_spec.args == [2])
+    assert(a.next_cmd.name == 'leaf' and b.next_cmd.name == 'aleaf')
+    assert(not hasattr(cmd, 'run_spec') and not hasattr(cmd, 'next_cmd'))
+    seen.clear()
+    a.run()
+    a.run()
+    assert(seen == [(1, 'a'), (1, 'a')])
+
+
+
+def test_concurrent_tasks():
+    N = 10000
+    async def one(i):
+        await cmd([str(i), 'aleaf' if i % 2 else 'leaf', '--tag', str(i)]).run()
+    async def main():
+        await asyncio.gather(*[one(i) for i in range(N)])
+    seen.clear()
+    asyncio.run(main())
+    assert(sorted(seen) == [(i, str(i)) for i in range(N)])
+
+
+
+def test_concurrent_threads():
+    N = 400
+    def one(i):
+        cmd([str(i), 'aleaf' if i % 2 else 'leaf', '--tag', str(i)]).run()
+    seen.clear()
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(one, range(N)))
+    assert(sorted(seen) == [(i, str(i)) for i in range(N)])
@@ -0,0 +1,159 @@
+import os, sys, time, socket, subprocess, pytest
+from yaclipy.server import forward
+
+
+CLI = '''
+import os, sys
+import yaclipy as CLI
+
+level = CLI.config_var('The level', 1)
+
+def hello(name='world', *, loud__l=False):
+    """ Say hello """
+    print(f"hello {name}{'!' if loud__l else ''} level={level()} cwd={os.getcwd()} env={os.environ.get('SRV_TEST')}")
+    level(level() + 1)
+
+def echo():
+    print(sys.stdin.read().upper(), end='')
+
+def fail():
+    sys.exit(3)
+
+@CLI.sub_cmds(hello, echo, fail)
+def root(): pass
+'''
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path/'srv_cli.py').write_text(CLI)
+    path = str(tmp_path/'srv.sock')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(tmp_path)] + sys.path))
+    proc = subprocess.Popen([sys.executable, '-m', 'yaclipy.server', 'srv_cli:root', path], env=env)
+    wait_for(path)
+    yield tmp_path, path
+    proc.kill()
+    proc.wait()
+
+
+def wait_for(path, timeout=20):
+    t = time.time()
+    while not os.path.exists(path):
+        assert(time.time() - t < timeout)
+        time.sleep(0.02)
+
+
+def call(tmp_path, argv, stdin=''):
+    (tmp_path/'in.txt').write_text(stdin)
+    with open(tmp_path/'in.txt') as i, open(tmp_path/'out.txt', 'w') as o, open(tmp_path/'err.txt', 'w') as e:
+        status = forward(str(tmp_path/'srv.sock'), argv, stdio=(i, o, e))
+    return status, (tmp_path/'out.txt').read_text(), (tmp_path/'err.txt').read_text()
+
+
+
+def test_forward_no_server(tmp_path):
+    assert(forward(str(tmp_path/'none.sock'), ['x']) == None)
+
+
+
+def test_server(server, monkeypatch):
+    tmp_path, path = server
+    assert(os.stat(path).st_mode & 0o777 == 0o600)
+    monkeypatch.setenv('SRV_TEST', 'abc')
+    monkeypatch.chdir(tmp_path)
+    # Each invocation gets its own config context
+    for _ in range(2):
+        assert(call(tmp_path, ['hello', 'bob', '-l']) == (0, f'hello bob! level=1 cwd={tmp_path} env=abc\n', ''))
+    assert(call(tmp_path, ['echo'], 'some input') == (0, 'SOME INPUT', ''))
+    assert(call(tmp_path, ['fail']) == (3, '', ''))
+    status, out, err = call(tmp_path, ['nope'])
+    assert(status == 1 and 'Command not found' in out)
+    # The client runs the command itself if the server can't set it up, and the server carries on
+    with monkeypatch.context() as m:
+        m.setattr('os.getcwd', lambda: str(tmp_path/'gone'))
+        assert(call(tmp_path, ['hello']) == (None, '', ''))
+    assert(call(tmp_path, ['hello'])[0] == 0)
+
+
+
+def test_server_not_socket(tmp_path, monkeypatch):
+    from yaclipy.server import Server
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path/'srv_cli.py').write_text(CLI)
+    (tmp_path/'data.txt').write_text('keep me')
+    server = Server('srv_cli:root', str(tmp_path/'data.txt'))
+    with pytest.raises(FileExistsError):
+        server.serve_forever()
+    assert((tmp_path/'data.txt').read_text() == 'keep me')
+
+
+
+@pytest.mark.skipif(not hasattr(socket, 'SO_PEERCRED'), reason='Linux only')
+def test_server_peer_uid(monkeypatch):
+    from yaclipy.server import Server
+    server = Server.__new__(Server)
+    a, b = socket.socketpair()
+    with a, b:
+        assert(server.trusted(a))
+        monkeypatch.setattr('os.getuid', lambda: -1)
+        assert(not server.trusted(a))
+
+
+
+def test_server_stale(server):
+    tmp_path, path = server
+    assert(call(tmp_path, ['hello'])[0] == 0)
+    (tmp_path/'srv_cli.py').write_text(CLI.replace('hello {name}', 'goodbye {name}'))
+    assert(call(tmp_path, ['hello']) == (None, '', ''))
+    # The server restarts with the new code
+    for _ in range(200):
+        status, out, err = call(tmp_path, ['hello'])
+        if status != None: break
+        time.sleep(0.05)
+    assert(out.startswith('goodbye world'))
+
+
+
+FORK_CLI = '''
+import os, sys, time
+import yaclipy as CLI
+
+calls = []
+
+def mutate(x):
+    calls.append(x)
+    print(f"{os.getpid()} {len(calls)}")
+
+def sleep(t:float):
+    time.sleep(t)
+
+def bad(x:int): pass
+
+@CLI.sub_cmds(mutate, sleep, bad)
+def root(): pass
+'''
+
+
+def test_fork_server(tmp_path):
+    (tmp_path/'fork_cli.py').write_text(FORK_CLI)
+    path = str(tmp_path/'srv.sock')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(tmp_path)] + sys.path))
+    proc = subprocess.Popen([sys.executable, '-m', 'yaclipy.server', 'fork_cli:root', path, '--fork'], env=env)
+    try:
+        wait_for(path)
+        # Every invocation starts with a clean module state, in a new process
+        outs = [call(tmp_path, ['mutate', str(i)]) for i in range(3)]
+        assert([o[1].split()[1] for o in outs] == ['1', '1', '1'])
+        assert(len({o[1].split()[0] for o in outs}) == 3)
+        # Bind errors are reported by the child
+        status, out, err = call(tmp_path, ['bad', 'x'])
+        assert(status == 1 and 'mismatch' in out)
+        # Invocations are concurrent
+        from concurrent.futures import ThreadPoolExecutor
+        t = time.time()
+        with ThreadPoolExecutor(4) as pool:
+            assert(list(pool.map(lambda _: forward(path, ['sleep', '0.5'], stdio=(0, 2, 2)), range(4))) == [0]*4)
+        assert(time.time() - t < 1.5)
+    finally:
+        proc.kill()
+        proc.wait()
@@ -0,0 +1,69 @@
+import tracemalloc
+from yaclipy import Command, sub_cmds
+
+
+def record(*, _input):
+    return None if _input % 2 else _input
+
+
+@sub_cmds(record)
+def records(*, n=0):
+    for i in range(n):
+        yield i
+
+
+@sub_cmds(records)
+async def shards(n:int):
+    for i in range(n):
+        yield {'n': i}
+
+
+def quiet(*, _input):
+    pass
+
+
+@sub_cmds(quiet)
+def many(n:int):
+    for i in range(n):
+        yield 'x' * 100 + str(i)
+
+
+
+def test_stream_returns_nothing():
+    assert(Command(records)(['-n', '3', 'record']).run() == [0, None, 2])
+    assert(Command(records)(['-n', '3', 'record']).run(stream=True) == None)
+
+
+def test_reducers():
+    assert(Command(records)(['-n', '5', 'record']).run(reduce='count') == 5)
+    assert(Command(shards)(['4', 'records', 'record']).run(reduce='count') == 6)
+    assert(Command(records)(['-n', '5', 'record']).run(reduce=lambda acc, v: acc + [v] if v else acc, initial=[]) == [2, 4])
+    assert(Command(shards)(['3', 'records', 'record']).run(jobs=2, reduce='count') == 3)
+
+
+def test_reduce_sum():
+    def nums(n:int):
+        return n
+    def double(*, _input):
+        yield _input
+        yield _input
+    assert(Command(sub_cmds(nums)(double))(['nums', '21']).run(reduce='sum') == 42)
+
+
+
+def peak(n, **kwargs):
+    bound = Command(many)([str(n), 'quiet'])
+    tracemalloc.start()
+    try:
+        bound.run(**kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_constant_memory():
+    for kwargs in [dict(stream=True), dict(jobs=8, reduce='count')]:
+        peak(10, **kwargs) # Import and cache everything that a run needs
+        small = peak(500, **kwargs)
+        assert(peak(10000, **kwargs) < small + 10000)
+    assert(peak(10000) > peak(10000, stream=True) + 10000 * 6) # Collecting the results does grow
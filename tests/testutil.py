@@ -14,8 +14,7 @@ def _to_args(v):
 
 def bind(fn, args):
     try:
-        cmd = Command(fn)
-        cmd(_to_args(args))
+        cmd = Command(fn)(_to_args(args))
         if DEBUG:
             print = Printer('--------- cmd.run_spec -----------')
             print.pretty(cmd.run_spec)
@@ -29,8 +28,7 @@ def bind(fn, args):
 
 def bind_unused(fn, args):
     try:
-        cmd = Command(fn)
-        cmd(_to_args(args))
+        cmd = Command(fn)(_to_args(args))
         if DEBUG:
             print = Printer('--------- cmd.run_spec -----------')
             print.pretty(cmd.run_spec)